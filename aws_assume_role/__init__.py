@@ -1 +1,16 @@
 __version__ = '0.1.0'
+
+
+def session(profile_name: str, config_path=None, region_name=None, **kwargs):
+    """
+    boto3 session of the stored profile, whose credentials are assumed again in-process before they expire::
+
+        import aws_assume_role
+
+        s3 = aws_assume_role.session('dev').client('s3')
+
+    boto3 and the rest of the library are only imported on the first call
+    """
+    from aws_assume_role.sessions import create_session
+
+    return create_session(profile_name, config_path, region_name, **kwargs)
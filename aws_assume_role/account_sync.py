@@ -0,0 +1,80 @@
+import dataclasses
+import re
+from typing import Iterable, List, Tuple, Dict, Optional
+
+from aws_assume_role.configuration import Configuration, StoredProfile
+
+
+@dataclasses.dataclass
+class AccountSyncPlan:
+    added: List[StoredProfile] = dataclasses.field(default_factory=list)
+    updated: List[Tuple[StoredProfile, StoredProfile]] = dataclasses.field(default_factory=list)
+    unchanged: int = 0
+    # (profile name, account id skipped, account id which got the name) of the accounts whose name is already taken
+    conflicts: List[Tuple[str, str, str]] = dataclasses.field(default_factory=list)
+    # Ids of the accounts whose profile name is empty, like a name without any ascii letter or digit
+    unnamed: List[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return len(self.added) > 0 or len(self.updated) > 0
+
+    @property
+    def has_conflicts(self) -> bool:
+        return len(self.conflicts) > 0 or len(self.unnamed) > 0
+
+
+def profile_name(account: Dict, name_template: str) -> str:
+    """
+    Render the template with the account fields: {id}, {name} (slug of the account name), {raw_name} and {email}
+    """
+    slug = re.sub(r'[^a-z0-9]+', '-', account.get('Name', '').lower()).strip('-')
+
+    return name_template.format(id=account['Id'], name=slug, raw_name=account.get('Name', ''),
+                                email=account.get('Email', ''))
+
+
+def plan_account_sync(config: Configuration, accounts: Iterable[Dict], name_template: str = '{name}',
+                      role_name: Optional[str] = None) -> AccountSyncPlan:
+    """
+    Compare the accounts against the stored profiles with the same name, without modifying the configuration. The
+    accounts without a name or with the name of a previous account are recorded on the plan instead of synced
+    """
+    plan = AccountSyncPlan()
+    planned = {}
+    # The first stored profile with a name wins, as in find_stored_profile
+    stored = {p.name: p for p in reversed(config.stored_profiles)}
+
+    for account in accounts:
+        name = profile_name(account, name_template)
+
+        if name == '':
+            plan.unnamed.append(account['Id'])
+            continue
+
+        if name in planned:
+            plan.conflicts.append((name, account['Id'], planned[name]))
+            continue
+
+        planned[name] = account['Id']
+        current = stored.get(name)
+
+        if current is None:
+            plan.added.append(StoredProfile(name, account['Id'], role_name))
+        elif current.account_id != account['Id'] or (role_name is not None and current.role_name != role_name):
+            updated = dataclasses.replace(current, account_id=account['Id'], role_name=role_name or current.role_name)
+            plan.updated.append((current, updated))
+        else:
+            plan.unchanged += 1
+
+    return plan
+
+
+def apply_account_sync(config: Configuration, plan: AccountSyncPlan):
+
+    for profile in plan.added:
+        config.add_profile(profile)
+
+    for current, updated in plan.updated:
+        current.account_id = updated.account_id
+        current.role_name = updated.role_name
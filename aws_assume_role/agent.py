@@ -0,0 +1,163 @@
+import hmac
+import json
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Optional
+
+from aws_assume_role.authentication.authorization import Authorizer
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.configuration import Profile
+from aws_assume_role.exceptions import AwsAssumeBaseException
+
+
+class CredentialAgent:
+    """
+    Keep the credentials of the profiles warm, assuming them again refresh_margin seconds before their expiration
+    """
+
+    def __init__(self, authorizer: Authorizer, profiles: List[Profile], refresh_margin: int, retry_delay: int = 30):
+        self.authorizer = authorizer
+        self.profiles = {p.name: p for p in profiles}
+        self.refresh_margin = refresh_margin
+        self.retry_delay = retry_delay
+        self._credentials: Dict[str, AuthorizationDetails] = {}
+        self._errors: Dict[str, BaseException] = {}
+        self._next_refresh: Dict[str, float] = {name: 0 for name in self.profiles}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='credential-agent-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def credentials(self, profile_name: str) -> Optional[AuthorizationDetails]:
+        with self._lock:
+            return self._credentials.get(profile_name)
+
+    def last_error(self, profile_name: str) -> Optional[BaseException]:
+        """
+        Error of the last refresh of the profile, or None if it was successful
+        """
+        with self._lock:
+            return self._errors.get(profile_name)
+
+    def refresh_due(self):
+        now = time.time()
+
+        for name, profile in self.profiles.items():
+            if self._next_refresh[name] <= now:
+                self.refresh(profile, force_refresh=name in self._credentials)
+
+    def refresh(self, profile: Profile, force_refresh: bool = True):
+        try:
+            details = self.authorizer.request_details(profile, force_refresh)
+        except (AwsAssumeBaseException, Exception) as e:
+            # The agent keeps serving the previous credentials, if any, and retries after the retry delay
+            print(f'{profile.name}: refresh FAILED ({e.__class__.__name__}: {e})', file=sys.stderr)
+
+            with self._lock:
+                self._errors[profile.name] = e
+
+            self._next_refresh[profile.name] = time.time() + self.retry_delay
+            return
+
+        with self._lock:
+            self._credentials[profile.name] = details
+            self._errors.pop(profile.name, None)
+
+        if details.expiration is None:
+            self._next_refresh[profile.name] = float('inf')
+        else:
+            next_refresh = details.expiration.timestamp() - self.refresh_margin
+            self._next_refresh[profile.name] = max(next_refresh, time.time() + self.retry_delay)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.refresh_due()
+
+            wait = min(self._next_refresh.values(), default=float('inf')) - time.time()
+            self._stopped.wait(timeout=min(max(wait, 0), 60))
+
+
+class CredentialAgentRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve the credentials on ``GET /<profile>`` with the format of the container credentials provider
+    (``AWS_CONTAINER_CREDENTIALS_FULL_URI``), only if the Authorization header contains the agent token
+    """
+
+    agent: CredentialAgent
+    token: str
+
+    def do_GET(self):
+
+        if not hmac.compare_digest(self.headers.get('Authorization', ''), self.token):
+            return self._send_json(401, {'message': 'Invalid authorization token'})
+
+        profile_name = self.path.strip('/')
+
+        if profile_name not in self.agent.profiles:
+            return self._send_json(404, {'message': f'Unknown profile: {profile_name}'})
+
+        details = self.agent.credentials(profile_name)
+
+        if details is None:
+            content = {'message': f'Credentials of {profile_name} not available yet'}
+            error = self.agent.last_error(profile_name)
+
+            if error is not None:
+                content['error'] = f'{error.__class__.__name__}: {error}'
+
+            return self._send_json(503, content)
+
+        document = {
+            'AccessKeyId': details.access_key,
+            'SecretAccessKey': details.secret_key,
+            'Token': details.session_token,
+        }
+
+        if details.expiration is not None:
+            document['Expiration'] = details.expiration.isoformat()
+
+        self._send_json(200, document)
+
+    def address_string(self) -> str:
+        # The unix socket connections have not a client address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, content: dict):
+        body = json.dumps(content).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def create_agent_server(agent: CredentialAgent, token: str, port: int = 0, socket_path: Optional[str] = None):
+    """
+    Create the http server of the agent, listening on the unix socket if it's defined, otherwise on localhost
+    """
+    handler = type('AgentRequestHandler', (CredentialAgentRequestHandler,), {'agent': agent, 'token': token})
+
+    if socket_path is not None:
+        return UnixHTTPServer(socket_path, handler)
+
+    return ThreadingHTTPServer(('127.0.0.1', port), handler)
@@ -1,22 +1,92 @@
+import threading
+from typing import Optional, TYPE_CHECKING, Dict, Tuple
+
+from aws_assume_role.authentication.authorization_cache import AuthorizationCache
 from aws_assume_role.authentication.authorization_details import AuthorizationDetails
 from aws_assume_role.authentication.authorization_writer import AuthorizationWriter
-from aws_assume_role.aws.sts import StsClient
 from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.exceptions import ProfileNotConfiguredException, InvalidRoleChainException
+from aws_assume_role.tracing import span
+
+if TYPE_CHECKING:
+    from aws_assume_role.aws.sts import StsClient
 
 
 class Authorizer:
 
-    def __init__(self, sts_client: StsClient, configuration: Configuration, writer: AuthorizationWriter):
+    def __init__(self, sts_client: 'StsClient', configuration: Configuration, writer: AuthorizationWriter,
+                 cache: Optional[AuthorizationCache] = None):
         self.sts_client = sts_client
         self.configuration = configuration
         self.writer = writer
+        self.cache = cache
+        self._hops: Dict[str, AuthorizationDetails] = {}
+        self._hop_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def request_details(self, profile: Profile, force_refresh: bool = False) -> AuthorizationDetails:
+        return self._request_details(profile, force_refresh, ())[0]
+
+    def authorize(self, profile: Profile, force_refresh: bool = False) -> Tuple[AuthorizationDetails, bool]:
+        """
+        Details of the profile, and whether they were served by the local cache instead of assumed
+        """
+        return self._request_details(profile, force_refresh, ())
+
+    def _request_details(self, profile: Profile, force_refresh: bool,
+                         chain: Tuple[str, ...]) -> Tuple[AuthorizationDetails, bool]:
 
-    def request_details(self, profile: Profile) -> AuthorizationDetails:
-        assumed_role = self.sts_client.assume(profile)
+        if self.cache is not None and not force_refresh:
+            with span('cache.get', profile=profile.name):
+                details = self.cache.get(profile)
+
+            if details is not None:
+                return details, True
+
+        source_details = None
+
+        if profile.source_profile is not None:
+            source_details = self._request_hop(profile, (*chain, profile.name))
+
+        assumed_role = self.sts_client.assume(profile, source_details)
         credentials = assumed_role['Credentials']
 
-        return AuthorizationDetails(
+        details = AuthorizationDetails(
             access_key=credentials['AccessKeyId'],
             secret_key=credentials['SecretAccessKey'],
             session_token=credentials['SessionToken'],
+            expiration=credentials.get('Expiration'),
         )
+
+        if self.cache is not None:
+            self.cache.put(profile, details)
+
+        return details, False
+
+    def _request_hop(self, profile: Profile, chain: Tuple[str, ...]) -> AuthorizationDetails:
+        """
+        Credentials of the source profile, shared by all the profiles chained to it
+        """
+        source_name = profile.source_profile
+
+        if source_name in chain:
+            raise InvalidRoleChainException(' -> '.join((*chain, source_name)))
+
+        source = self.configuration.find_profile(source_name)
+
+        if source is None:
+            raise ProfileNotConfiguredException(f"For source profile {source_name} of {profile.name}")
+
+        with self._lock:
+            hop_lock = self._hop_locks.setdefault(source_name, threading.Lock())
+
+        # Concurrent profiles behind the same source wait for a single assume of it
+        with hop_lock:
+            details = self._hops.get(source_name)
+            margin = self.cache.refresh_margin if self.cache is not None else 0
+
+            if details is None or details.expires_within(margin):
+                details, _ = self._request_details(source, False, chain)
+                self._hops[source_name] = details
+
+            return details
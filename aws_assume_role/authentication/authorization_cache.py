@@ -0,0 +1,60 @@
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.utils.file_utils import read_json_file, write_json_file
+
+
+class AuthorizationCache:
+    """
+    On-disk cache of the assumed credentials, served until the refresh margin before the expiration
+    """
+
+    def __init__(self, cache_dir: Path, refresh_margin: int):
+        self.cache_dir = cache_dir
+        self.refresh_margin = refresh_margin
+
+    @staticmethod
+    def from_configuration(configuration: Configuration):
+        return AuthorizationCache(configuration.cache_dir_path/'credentials',
+                                  configuration.credentials_refresh_margin)
+
+    def get(self, profile: Profile) -> Optional[AuthorizationDetails]:
+        content = read_json_file(self._entry_path(profile))
+
+        if content is None:
+            return None
+
+        try:
+            details = AuthorizationDetails.from_dict(content)
+        except (TypeError, ValueError):
+            return None
+
+        if details.expires_within(self.refresh_margin):
+            return None
+
+        return details
+
+    def put(self, profile: Profile, details: AuthorizationDetails):
+        if details.expiration is None:
+            return
+
+        write_json_file(self._entry_path(profile), details.to_dict())
+
+    def invalidate(self, profile: Profile):
+        self._entry_path(profile).unlink(missing_ok=True)
+
+    def _entry_path(self, profile: Profile) -> Path:
+        return self.cache_dir/f'{self.cache_key(profile)}.json'
+
+    @staticmethod
+    def cache_key(profile: Profile) -> str:
+        fields = [profile.account_id, profile.role_name, profile.aws_profile, profile.name]
+
+        if profile.source_profile is not None:
+            fields.append(profile.source_profile)
+
+        key = '\0'.join(str(v) for v in fields)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict
 
 
 @dataclass
@@ -7,3 +9,25 @@ class AuthorizationDetails:
     access_key: str
     secret_key: str
     session_token: str
+    expiration: Optional[datetime] = None
+
+    def expires_within(self, seconds: int) -> bool:
+        if self.expiration is None:
+            return True
+
+        return self.expiration - timedelta(seconds=seconds) <= datetime.now(timezone.utc)
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.__dict__,
+            'expiration': self.expiration.isoformat() if self.expiration is not None else None
+        }
+
+    @staticmethod
+    def from_dict(dictionary):
+        expiration = dictionary.pop('expiration', None)
+
+        if expiration is not None:
+            expiration = datetime.fromisoformat(expiration)
+
+        return AuthorizationDetails(expiration=expiration, **dictionary)
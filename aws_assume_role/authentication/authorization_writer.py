@@ -1,13 +1,19 @@
 import abc
+import json
 import textwrap
 from abc import ABCMeta
-from configparser import ConfigParser
-from typing import Optional, Callable
-
-import pyperclip
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Callable, List, Tuple, Dict
 
+from aws_assume_role.authentication.authorization_cache import AuthorizationCache
 from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.aws.credentials_file import EXPIRATION_KEY, remove_expired_sections
 from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.exceptions import SinkWriteException, SinkPathTemplateException
+from aws_assume_role.tracing import span, in_current_context
+from aws_assume_role.utils.file_utils import write_private_file
+from aws_assume_role.utils.ini_file import edit_ini_file
 
 
 class AuthorizationWriter(metaclass=ABCMeta):
@@ -16,41 +22,73 @@ class AuthorizationWriter(metaclass=ABCMeta):
     def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
         pass
 
+    def write_batch(self, authorizations: List[Tuple[AuthorizationDetails, Profile]], region: Optional[str]):
+        for details, profile in authorizations:
+            self.write(details, profile, region)
+
+
+def credentials_variables(details: AuthorizationDetails, region: str) -> Dict[str, str]:
+    return {
+        'AWS_ACCESS_KEY_ID': details.access_key,
+        'AWS_SECRET_ACCESS_KEY': details.secret_key,
+        'AWS_SESSION_TOKEN': details.session_token,
+        'AWS_DEFAULT_REGION': region,
+    }
+
+
+def credentials_document(details: AuthorizationDetails) -> Dict:
+    """
+    JSON document expected by the ``credential_process`` setting of the AWS SDKs
+    """
+    document = {
+        'Version': 1,
+        'AccessKeyId': details.access_key,
+        'SecretAccessKey': details.secret_key,
+        'SessionToken': details.session_token,
+    }
+
+    if details.expiration is not None:
+        document['Expiration'] = details.expiration.isoformat()
+
+    return document
+
 
 class ConfigFileAuthorizationWriter(AuthorizationWriter):
+    """
+    Update the profile sections of the credentials file under an advisory lock, keeping the rest of the file as is
+    and replacing it atomically. With prune_expired, the expired sections are removed on the same write
+    """
 
-    def __init__(self, config: Configuration):
+    def __init__(self, config: Configuration, prune_expired: bool = False):
         self.config = config
-        self.parser_factory = ConfigParser
+        self.prune_expired = prune_expired
+        self.pruned: List[str] = []
 
     def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
-        credentials = self.__read_credentials()
-
-        merged_region = region or self.config.aws_default_region
+        self.write_batch([(details, profile)], region)
 
-        if profile.name not in credentials:
-            credentials[profile.name] = {}
+    def write_batch(self, authorizations: List[Tuple[AuthorizationDetails, Profile]], region: Optional[str]):
 
-        profile_cred = credentials[profile.name]
+        merged_region = region or self.config.aws_default_region
 
-        profile_cred['region'] = merged_region
-        profile_cred['aws_access_key_id'] = details.access_key
-        profile_cred['aws_secret_access_key'] = details.secret_key
-        profile_cred['aws_session_token'] = details.session_token
+        with span('writer.credentials_file', profiles=len(authorizations)), \
+                edit_ini_file(self.config.aws_credentials_file_path) as credentials:
 
-        self.__write_credentials(credentials)
+            for details, profile in authorizations:
+                values = {
+                    'region': merged_region,
+                    'aws_access_key_id': details.access_key,
+                    'aws_secret_access_key': details.secret_key,
+                    'aws_session_token': details.session_token,
+                }
 
-    def __read_credentials(self) -> ConfigParser:
-        credentials_path = self.config.aws_credentials_file_path
-        parser = self.parser_factory()
-        parser.read(credentials_path)
-        return parser
+                if details.expiration is not None:
+                    values[EXPIRATION_KEY] = details.expiration.isoformat()
 
-    def __write_credentials(self, credentials: ConfigParser):
-        credentials_path = self.config.aws_credentials_file_path
+                credentials.update(profile.name, values)
 
-        with credentials_path.open(mode='w') as writeable:
-            credentials.write(writeable)
+            if self.prune_expired:
+                self.pruned.extend(remove_expired_sections(credentials))
 
 
 class SessionEnvAuthorizationWriter(AuthorizationWriter):
@@ -81,5 +119,160 @@ class SessionEnvAuthorizationWriter(AuthorizationWriter):
         {copy_content}
         ''')
 
-        pyperclip.copy(copy_content)
+        with span('writer.clipboard'):
+            import pyperclip
+
+            pyperclip.copy(copy_content)
+
         self.user_output_interface(print_content)
+
+
+class ProcessCredentialsAuthorizationWriter(AuthorizationWriter):
+    """
+    Print the credentials as the JSON document expected by the ``credential_process`` setting of the AWS SDKs
+    """
+
+    def __init__(self, config: Configuration, user_output_interface: Callable[[str], None] = print):
+        self.config = config
+        self.user_output_interface = user_output_interface
+
+    def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
+
+        with span('writer.process_output'):
+            self.user_output_interface(json.dumps(credentials_document(details)))
+
+
+class EnvSnapshotAuthorizationWriter(AuthorizationWriter):
+    """
+    Write the credentials variables of each profile as bash/zsh (``<profile>.sh``) and fish (``<profile>.fish``)
+    snapshots, only readable by the owner. The first line is ``# expires <epoch seconds> <profile>``, so the shell
+    hook can check the freshness without starting Python
+    """
+
+    def __init__(self, config: Configuration):
+        self.config = config
+
+    @staticmethod
+    def snapshot_dir(config: Configuration) -> Path:
+        return config.cache_dir_path/'env'
+
+    def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
+
+        variables = credentials_variables(details, region or self.config.aws_default_region)
+        expires = int(details.expiration.timestamp()) if details.expiration is not None else 0
+        header = f'# expires {expires} {profile.name}\n'
+        snapshot_dir = self.snapshot_dir(self.config)
+
+        with span('writer.env_snapshot', profile=profile.name):
+            write_private_file(snapshot_dir/f'{profile.name}.sh',
+                               header + ''.join(f'export {k}="{v}"\n' for k, v in variables.items()))
+            write_private_file(snapshot_dir/f'{profile.name}.fish',
+                               header + ''.join(f'set -gx {k} "{v}"\n' for k, v in variables.items()))
+
+
+class ExportsAuthorizationWriter(AuthorizationWriter):
+    """
+    Print the credentials variables as export lines, to be evaluated by the shell: ``eval "$(aws-assume-role ...)"``
+    """
+
+    def __init__(self, config: Configuration, user_output_interface: Callable[[str], None] = print):
+        self.config = config
+        self.user_output_interface = user_output_interface
+
+    def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
+
+        variables = credentials_variables(details, region or self.config.aws_default_region)
+
+        with span('writer.exports'):
+            self.user_output_interface(''.join(f'export {k}="{v}"\n' for k, v in variables.items()).rstrip('\n'))
+
+
+class ProfileFileAuthorizationWriter(AuthorizationWriter, metaclass=ABCMeta):
+    """
+    Writer of a file per profile, where the ``{profile}`` placeholder of the path is replaced by the profile name. The
+    placeholder is required to write several profiles, otherwise each one would overwrite the previous
+    """
+
+    def __init__(self, config: Configuration, path_template: str):
+        self.config = config
+        self.path_template = path_template
+
+    def write_batch(self, authorizations: List[Tuple[AuthorizationDetails, Profile]], region: Optional[str]):
+        if len(authorizations) > 1 and '{profile}' not in self.path_template:
+            raise SinkPathTemplateException(f'The path {self.path_template} needs the {{profile}} placeholder to '
+                                            f'write the credentials of {len(authorizations)} profiles')
+
+        super().write_batch(authorizations, region)
+
+    def profile_path(self, profile: Profile) -> Path:
+        return Path(self.path_template.format(profile=profile.name)).expanduser()
+
+
+class DotenvAuthorizationWriter(ProfileFileAuthorizationWriter):
+    """
+    Write the credentials variables as a dotenv file (like the env_file of docker compose), only readable by the
+    owner. The ``{profile}`` placeholder of the path is replaced by the profile name
+    """
+
+    def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
+
+        variables = credentials_variables(details, region or self.config.aws_default_region)
+        path = self.profile_path(profile)
+
+        with span('writer.dotenv', profile=profile.name):
+            write_private_file(path, ''.join(f'{k}={v}\n' for k, v in variables.items()))
+
+
+class JsonFileAuthorizationWriter(ProfileFileAuthorizationWriter):
+    """
+    Write the credential_process document of the credentials, with the region, as a JSON file only readable by the
+    owner. The ``{profile}`` placeholder of the path is replaced by the profile name
+    """
+
+    def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
+
+        document = {**credentials_document(details), 'Region': region or self.config.aws_default_region}
+        path = self.profile_path(profile)
+
+        with span('writer.json', profile=profile.name):
+            write_private_file(path, json.dumps(document, indent=2))
+
+
+class CacheAuthorizationWriter(AuthorizationWriter):
+    """
+    Store the credentials on the local cache served by ``--process``, so the SDKs get them without assuming again
+    """
+
+    def __init__(self, cache: AuthorizationCache):
+        self.cache = cache
+
+    def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
+
+        with span('writer.cache', profile=profile.name):
+            self.cache.put(profile, details)
+
+
+class MultiAuthorizationWriter(AuthorizationWriter):
+    """
+    Write the same credentials on several named sinks concurrently. Every sink is written even if others fail, and
+    the failed ones are raised at the end as a SinkWriteException
+    """
+
+    def __init__(self, writers: Dict[str, AuthorizationWriter], max_workers: int = 4):
+        self.writers = writers
+        self.max_workers = max_workers
+
+    def write(self, details: AuthorizationDetails, profile: Profile, region: Optional[str]):
+        self.write_batch([(details, profile)], region)
+
+    def write_batch(self, authorizations: List[Tuple[AuthorizationDetails, Profile]], region: Optional[str]):
+
+        with span('writer.multi', sinks=len(self.writers)), \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {name: executor.submit(in_current_context(writer.write_batch), authorizations, region)
+                       for name, writer in self.writers.items()}
+
+        failures = {name: future.exception() for name, future in futures.items() if future.exception() is not None}
+
+        if len(failures) > 0:
+            raise SinkWriteException(failures)
@@ -1,20 +1,172 @@
+import hashlib
 import os
-
-import boto3
+import threading
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING, Tuple
 
 from aws_assume_role.configuration import Profile, Configuration
+from aws_assume_role.tracing import span
+
+if TYPE_CHECKING:
+    import boto3
+
+    from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+
+
+class BotoClientPool:
+    """
+    Process-wide pool of boto sessions and clients, keyed by the source profile, the region and the config files.
+    The least recently used entries are evicted when the pool is bigger than max_size
+    """
+
+    def __init__(self, max_size: int = 16, max_pool_connections: int = 10, tcp_keepalive: bool = True):
+        self.max_size = max_size
+        self.max_pool_connections = max_pool_connections
+        self.tcp_keepalive = tcp_keepalive
+        self._sessions = OrderedDict()
+        self._clients = OrderedDict()
+        self._lock = threading.RLock()
+
+    def client(self, service_name: str, aws_profile: Optional[str], region_name: Optional[str] = None,
+               config_file: Optional[str] = None, credentials_file: Optional[str] = None,
+               endpoint_url: Optional[str] = None,
+               credentials: Optional['AuthorizationDetails'] = None,
+               max_attempts: Optional[int] = None) -> 'boto3.client':
+        """
+        Return the client of the source profile, or signed with the explicit credentials if they are defined. With
+        max_attempts, it overrides the botocore retries (1 to disable them)
+        """
+        session_key = (aws_profile, config_file, credentials_file)
+        access_key = credentials.access_key if credentials is not None else None
+        client_key = (service_name, region_name, endpoint_url, access_key, max_attempts, *session_key)
+
+        # Neither boto sessions nor the client creation are thread safe, but the created clients are
+        with self._lock:
+            if client_key not in self._clients:
+                session = self.session(aws_profile, config_file, credentials_file)
+                explicit_credentials = {}
+
+                if credentials is not None:
+                    explicit_credentials = {
+                        'aws_access_key_id': credentials.access_key,
+                        'aws_secret_access_key': credentials.secret_key,
+                        'aws_session_token': credentials.session_token,
+                    }
+
+                with span('boto.client', service=service_name):
+                    self._clients[client_key] = session.client(service_name, region_name=region_name,
+                                                               endpoint_url=endpoint_url,
+                                                               config=self._client_config(max_attempts),
+                                                               **explicit_credentials)
+
+            self._clients.move_to_end(client_key)
+            self._evict(self._clients)
+
+            return self._clients[client_key]
+
+    def session(self, aws_profile: Optional[str], config_file: Optional[str] = None,
+                credentials_file: Optional[str] = None) -> 'boto3.Session':
+
+        session_key = (aws_profile, config_file, credentials_file)
+
+        with self._lock:
+            if session_key not in self._sessions:
+                with span('boto.session', aws_profile=aws_profile):
+                    self._sessions[session_key] = self._create_session(*session_key)
+
+            self._sessions.move_to_end(session_key)
+            self._evict(self._sessions)
+
+            return self._sessions[session_key]
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+
+    def _evict(self, entries: OrderedDict):
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def _client_config(self, max_attempts: Optional[int] = None):
+        from botocore.config import Config
+
+        retries = {'total_max_attempts': max_attempts} if max_attempts is not None else None
+
+        return Config(max_pool_connections=self.max_pool_connections, tcp_keepalive=self.tcp_keepalive,
+                      retries=retries)
+
+    @staticmethod
+    def _create_session(aws_profile: Optional[str], config_file: Optional[str], credentials_file: Optional[str]):
+        # boto3 takes hundreds of milliseconds to import, so only the commands that reach AWS pay for it
+        import boto3
+        import botocore.session
+
+        botocore_session = botocore.session.Session(profile=aws_profile)
+
+        if config_file is not None:
+            botocore_session.set_config_variable('config_file', config_file)
+
+        if credentials_file is not None:
+            botocore_session.set_config_variable('credentials_file', credentials_file)
+
+        return boto3.Session(botocore_session=botocore_session)
+
+
+_default_pool: Optional[BotoClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def default_client_pool(configuration: Configuration) -> BotoClientPool:
+    """
+    Return the process-wide pool, created with the settings of the first configuration using it
+    """
+    global _default_pool
+
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BotoClientPool(configuration.boto_pool_size,
+                                           configuration.boto_max_pool_connections,
+                                           configuration.boto_tcp_keepalive)
+
+        return _default_pool
+
+
+def aws_config_files(configuration: Configuration) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return the (config, credentials) files to use by boto, where the AWS environment variables take precedence
+    """
+    config_file = os.environ.get('AWS_CONFIG_FILE') or configuration.aws_config_file
+    credentials_file = os.environ.get('AWS_SHARED_CREDENTIALS_FILE') or configuration.aws_credentials_file
+
+    return config_file, credentials_file
+
+
+def default_boto_client_factory(service_name, profile: Profile, configuration: Configuration,
+                                region_name: Optional[str] = None, endpoint_url: Optional[str] = None,
+                                credentials: Optional['AuthorizationDetails'] = None,
+                                max_attempts: Optional[int] = None) -> 'boto3.client':
+
+    config_file, credentials_file = aws_config_files(configuration)
+
+    # Override of the endpoint of a service for all the profiles, like a local stand-in of STS on the load tests
+    endpoint_url = os.environ.get(f'ASSUME_AWS_{service_name.upper()}_ENDPOINT_URL') or endpoint_url
 
+    return default_client_pool(configuration).client(service_name, profile.aws_profile, region_name,
+                                                     config_file, credentials_file, endpoint_url, credentials,
+                                                     max_attempts)
 
-def default_boto_client_factory(service_name, profile: Profile, configuration: Configuration) -> boto3.client:
 
-    aws_credentials_file = configuration.aws_credentials_file
-    if aws_credentials_file is not None:
-        os.environ.setdefault('AWS_SHARED_CREDENTIALS_FILE', aws_credentials_file)
+def credentials_fingerprint(boto_client) -> Optional[str]:
+    """
+    Hash of the access key used to sign the client requests, or None when the client hasn't credentials
+    """
+    # botocore doesn't expose the credentials of a client, only through its request signer
+    credentials = getattr(getattr(boto_client, '_request_signer', None), '_credentials', None)
 
-    aws_config_file = configuration.aws_config_file
-    if aws_config_file is not None:
-        os.environ.setdefault('AWS_CONFIG_FILE', aws_config_file)
+    if credentials is None:
+        return None
 
-    session = boto3.Session(profile_name=profile.aws_profile)
+    access_key = credentials.get_frozen_credentials().access_key
 
-    return session.client(service_name)
+    return hashlib.sha1(access_key.encode('utf-8')).hexdigest()
@@ -0,0 +1,19 @@
+from typing import List
+
+from aws_assume_role.configuration import Configuration
+from aws_assume_role.utils.ini_file import edit_ini_file
+
+
+def config_section_name(profile_name: str) -> str:
+    return profile_name if profile_name == 'default' else f'profile {profile_name}'
+
+
+def write_credential_process(config: Configuration, profile_names: List[str], command: str):
+    """
+    Point the profiles of the aws config file to ``<command> --process <profile>``
+    """
+    with edit_ini_file(config.aws_config_file_path) as aws_config:
+
+        for profile_name in profile_names:
+            aws_config.update(config_section_name(profile_name),
+                              {'credential_process': f'{command} --process {profile_name}'})
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from aws_assume_role.utils.ini_file import IniDocument
+
+EXPIRATION_KEY = 'aws_session_expiration'
+
+
+@dataclass
+class CredentialsStatus:
+    name: str
+    stored: bool
+    expiration: Optional[datetime] = None
+
+    def remaining(self, now: datetime) -> Optional[float]:
+        """
+        Seconds until the expiration, negative if already expired, or None if it's unknown
+        """
+        if self.expiration is None:
+            return None
+
+        return (self.expiration - now).total_seconds()
+
+    def state(self, now: datetime, within: float) -> str:
+        remaining = self.remaining(now)
+
+        if not self.stored:
+            return 'missing'
+
+        if remaining is None:
+            return 'unknown'
+
+        if remaining <= 0:
+            return 'expired'
+
+        return 'expiring' if remaining <= within else 'valid'
+
+    def needs_refresh(self, now: datetime, within: float) -> bool:
+        return self.state(now, within) != 'valid'
+
+
+def parse_expiration(section: dict) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(section[EXPIRATION_KEY])
+    except (KeyError, ValueError):
+        return None
+
+
+def read_credentials_status(path: Path, names: List[str]) -> List[CredentialsStatus]:
+    """
+    Expiration of the credentials of each profile, scanning the credentials file once
+    """
+    path = path.expanduser()
+    document = IniDocument.parse(path.read_text(encoding='utf-8') if path.exists() else '')
+
+    sections = {}
+
+    for name, section in document.items():
+        sections.setdefault(name, section)
+
+    return [CredentialsStatus(name, name in sections, parse_expiration(sections[name]) if name in sections else None)
+            for name in names]
+
+
+def remove_expired_sections(document: IniDocument, now: Optional[datetime] = None) -> List[str]:
+    """
+    Remove the sections whose recorded expiration has passed, the sections without it are never removed
+    """
+    now = now or datetime.now(timezone.utc)
+    expired = []
+
+    for name, section in list(document.items()):
+        expiration = parse_expiration(section)
+
+        if expiration is not None and expiration <= now:
+            expired.append(name)
+
+    for name in expired:
+        document.remove(name)
+
+    return expired
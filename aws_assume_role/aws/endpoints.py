@@ -0,0 +1,144 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple, Dict
+
+from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.utils.file_utils import read_json_file, write_json_file
+
+AUTO_REGION = 'auto'
+
+# Seconds to keep the result of a measure where no candidate region was reachable, so each run doesn't wait for the
+# probe timeout while offline, yet the regions are measured again soon after the network is back
+UNREACHABLE_TTL = 300
+
+
+def sts_regional_endpoint_url(region: str) -> str:
+    suffix = 'amazonaws.com.cn' if region.startswith('cn-') else 'amazonaws.com'
+    return f'https://sts.{region}.{suffix}'
+
+
+def probe_handshake_latency(endpoint_url: str, timeout: float) -> float:
+    """
+    Seconds to open a TCP connection and complete the TLS handshake with the endpoint
+    """
+    import ssl
+
+    host = endpoint_url.split('://', 1)[-1].split('/', 1)[0]
+    started_at = time.perf_counter()
+
+    with socket.create_connection((host, 443), timeout=timeout) as sock:
+        with ssl.create_default_context().wrap_socket(sock, server_hostname=host):
+            return time.perf_counter() - started_at
+
+
+def is_endpoint_error(error: BaseException) -> bool:
+    """
+    Whether the error, or its cause, is a failure to connect to the endpoint
+    """
+    from botocore.exceptions import EndpointConnectionError, ConnectTimeoutError
+
+    while error is not None:
+        if isinstance(error, (EndpointConnectionError, ConnectTimeoutError)):
+            return True
+
+        error = error.__cause__
+
+    return False
+
+
+class StsEndpointResolver:
+    """
+    Resolve the region and the endpoint of the STS client of a profile. With the ``auto`` region, the candidate
+    region with the fastest handshake is used, cached during the ttl (seconds). A region which fails a real request
+    is dropped for the next fastest one, or the botocore default when there are no more. The resolver is shared by
+    the concurrent assumes, which wait for a single measure
+    """
+
+    def __init__(self, candidate_regions: List[str], cache_path: Path, ttl: int, probe_timeout: float = 2,
+                 probe=probe_handshake_latency):
+        self.candidate_regions = candidate_regions
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self.probe = probe
+        self._fastest_region: Optional[str] = None
+        self._latencies: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_configuration(configuration: Configuration):
+        regions = [r.strip() for r in configuration.sts_candidate_regions.split(',') if r.strip()]
+        return StsEndpointResolver(regions, configuration.cache_dir_path/'sts_endpoint.json',
+                                   configuration.sts_endpoint_ttl)
+
+    def resolve(self, profile: Profile) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return the (region, endpoint url) of the profile, where None means the botocore default
+        """
+        region = profile.sts_region
+
+        if region == AUTO_REGION:
+            region = self.fastest_region()
+
+        if profile.sts_endpoint_url is not None:
+            return region, profile.sts_endpoint_url
+
+        if region is None:
+            return None, None
+
+        # Explicit url, because botocore could use the global endpoint for some regions
+        return region, sts_regional_endpoint_url(region)
+
+    def fastest_region(self) -> Optional[str]:
+        with self._lock:
+            if self._latencies is not None:
+                return self._fastest_region
+
+            cached = read_json_file(self.cache_path) or {}
+            latencies = cached.get('latencies') or {}
+            ttl = self.ttl if len(latencies) > 0 else min(self.ttl, UNREACHABLE_TTL)
+
+            if cached.get('regions') == self.candidate_regions and cached.get('measured_at', 0) + ttl > time.time():
+                self._latencies = latencies
+                self._fastest_region = cached.get('region') if len(latencies) > 0 else None
+                return self._fastest_region
+
+            # Without network to probe, the empty result is stored too: the botocore default is the best choice
+            self._store(self._measure(), time.time())
+
+            return self._fastest_region
+
+    def region_failed(self, region: str):
+        """
+        Drop the region after a failed request, for this process and the next ones until the cache expires
+        """
+        with self._lock:
+            cached = read_json_file(self.cache_path) or {}
+            self._store({r: latency for r, latency in (self._latencies or {}).items() if r != region},
+                        cached.get('measured_at', time.time()))
+
+    def _store(self, latencies: Dict[str, float], measured_at: float):
+        self._latencies = latencies
+        self._fastest_region = min(latencies, key=latencies.get) if len(latencies) > 0 else None
+
+        write_json_file(self.cache_path, {'regions': self.candidate_regions, 'region': self._fastest_region,
+                                          'latencies': latencies, 'measured_at': measured_at})
+
+    def _measure(self) -> dict:
+
+        def measure(region: str) -> Optional[float]:
+            try:
+                return self.probe(sts_regional_endpoint_url(region), self.probe_timeout)
+            except OSError:
+                return None
+
+        if len(self.candidate_regions) == 0:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(self.candidate_regions)) as executor:
+            results = zip(self.candidate_regions, executor.map(measure, self.candidate_regions))
+
+        return {region: latency for region, latency in results if latency is not None}
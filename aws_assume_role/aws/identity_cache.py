@@ -0,0 +1,43 @@
+import time
+from pathlib import Path
+from typing import Optional
+
+from aws_assume_role.configuration import Configuration
+from aws_assume_role.utils.file_utils import read_json_file, write_json_file
+
+
+class IdentityCache:
+    """
+    Verified caller identities per source profile and credentials fingerprint, valid during the ttl (seconds)
+    """
+
+    def __init__(self, path: Path, ttl: int):
+        self.path = path
+        self.ttl = ttl
+
+    @staticmethod
+    def from_configuration(configuration: Configuration):
+        return IdentityCache(configuration.cache_dir_path/'identities.json', configuration.identity_cache_ttl)
+
+    def get(self, aws_profile: str, fingerprint: str) -> Optional[str]:
+        entry = self._read().get(self._key(aws_profile, fingerprint))
+
+        if entry is None or entry.get('verified_at', 0) + self.ttl <= time.time():
+            return None
+
+        return entry.get('account')
+
+    def put(self, aws_profile: str, fingerprint: str, account: str):
+        now = time.time()
+
+        entries = {k: v for k, v in self._read().items() if v.get('verified_at', 0) + self.ttl > now}
+        entries[self._key(aws_profile, fingerprint)] = {'account': account, 'verified_at': now}
+
+        write_json_file(self.path, entries)
+
+    def _read(self) -> dict:
+        return read_json_file(self.path) or {}
+
+    @staticmethod
+    def _key(aws_profile: str, fingerprint: str) -> str:
+        return f'{aws_profile}:{fingerprint}'
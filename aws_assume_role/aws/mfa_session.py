@@ -0,0 +1,143 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.tracing import span
+from aws_assume_role.utils.file_utils import read_json_file, write_json_file
+
+KEYRING_SERVICE = 'aws-assume-role'
+
+
+class MfaSessionCache:
+    """
+    MFA sessions per source profile and MFA device, stored on a file only readable by the owner or on the system
+    keyring when use_keyring is enabled and the keyring package is installed. They're served until the refresh margin
+    before their expiration. A keyring without usable backend, like on headless hosts, falls back to the files
+    """
+
+    def __init__(self, cache_dir: Path, refresh_margin: int, use_keyring: bool = False):
+        self.cache_dir = cache_dir
+        self.refresh_margin = refresh_margin
+        self.keyring = self._load_keyring() if use_keyring else None
+
+    @staticmethod
+    def from_configuration(configuration: Configuration):
+        return MfaSessionCache(configuration.cache_dir_path/'mfa', configuration.credentials_refresh_margin,
+                               configuration.mfa_keyring)
+
+    def get(self, profile: Profile) -> Optional[AuthorizationDetails]:
+        key = self.cache_key(profile)
+
+        content = self._keyring_get(key) if self.keyring is not None else read_json_file(self.cache_dir/f'{key}.json')
+
+        if content is None:
+            return None
+
+        try:
+            details = AuthorizationDetails.from_dict(content)
+        except (TypeError, ValueError):
+            return None
+
+        return None if details.expires_within(self.refresh_margin) else details
+
+    def put(self, profile: Profile, details: AuthorizationDetails):
+        key = self.cache_key(profile)
+
+        if self.keyring is not None:
+            try:
+                self.keyring.set_password(KEYRING_SERVICE, key, json.dumps(details.to_dict()))
+                return
+            except self._keyring_errors():
+                pass
+
+        write_json_file(self.cache_dir/f'{key}.json', details.to_dict())
+
+    def _keyring_get(self, key: str) -> Optional[Dict]:
+        try:
+            stored = self.keyring.get_password(KEYRING_SERVICE, key)
+        except self._keyring_errors():
+            return read_json_file(self.cache_dir/f'{key}.json')
+
+        try:
+            return json.loads(stored) if stored is not None else None
+        except ValueError:
+            return None
+
+    def _keyring_errors(self):
+        # NoKeyringError is also a RuntimeError, the base KeyringError is only available with the package
+        errors = getattr(self.keyring, 'errors', None)
+        return (RuntimeError, errors.KeyringError) if errors is not None else (RuntimeError,)
+
+    @staticmethod
+    def cache_key(profile: Profile) -> str:
+        key = f'{profile.aws_profile}\0{profile.mfa_serial}'
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _load_keyring():
+        # Optional dependency (pip install aws-assume-role[keyring]), without it the sessions are stored on files
+        try:
+            import keyring
+            import keyring.errors
+        except ImportError:
+            return None
+
+        return keyring
+
+
+class MfaSessionProvider:
+    """
+    GetSessionToken with the MFA code of the source profile, asked once per session through the token provider and
+    shared by every assume until it expires
+    """
+
+    def __init__(self, token_provider: Callable[[str], str], duration: int,
+                 cache: Optional[MfaSessionCache] = None):
+        self.token_provider = token_provider
+        self.duration = duration
+        self.cache = cache
+        self._sessions: Dict[str, AuthorizationDetails] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def session(self, profile: Profile, sts_client) -> AuthorizationDetails:
+        """
+        MFA session of the profile source, where sts_client is signed with its long-lived credentials
+        """
+        key = MfaSessionCache.cache_key(profile)
+
+        with self._lock:
+            session_lock = self._locks.setdefault(key, threading.Lock())
+
+        # Concurrent assumes wait for a single prompt of the MFA code
+        with session_lock:
+            details = self._sessions.get(key)
+            margin = self.cache.refresh_margin if self.cache is not None else 0
+
+            if details is not None and not details.expires_within(margin):
+                return details
+
+            details = self.cache.get(profile) if self.cache is not None else None
+
+            if details is None:
+                details = self._get_session_token(profile, sts_client)
+
+                if self.cache is not None:
+                    self.cache.put(profile, details)
+
+            self._sessions[key] = details
+            return details
+
+    def _get_session_token(self, profile: Profile, sts_client) -> AuthorizationDetails:
+        token_code = self.token_provider(profile.mfa_serial)
+
+        with span('sts.get_session_token', aws_profile=profile.aws_profile):
+            credentials = sts_client.get_session_token(SerialNumber=profile.mfa_serial, TokenCode=token_code,
+                                                       DurationSeconds=self.duration)['Credentials']
+
+        return AuthorizationDetails(credentials['AccessKeyId'], credentials['SecretAccessKey'],
+                                    credentials['SessionToken'], credentials.get('Expiration'))
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional
+
+from aws_assume_role.aws import default_client_pool, aws_config_files
+from aws_assume_role.configuration import Configuration
+
+
+class OrganizationsClient:
+
+    def __init__(self, boto_organizations_client, max_workers: int = 8):
+        self.boto_organizations_client = boto_organizations_client
+        self.max_workers = max_workers
+
+    @staticmethod
+    def from_default_factory(configuration: Configuration):
+        config_file, credentials_file = aws_config_files(configuration)
+        client = default_client_pool(configuration).client('organizations', configuration.aws_profile,
+                                                           config_file=config_file, credentials_file=credentials_file)
+        return OrganizationsClient(client)
+
+    def iter_accounts(self, parent_ids: Optional[List[str]] = None,
+                      tags: Optional[Dict[str, str]] = None) -> Iterator[Dict]:
+        """
+        Stream the active accounts of the organization, or only the ones under the organizational units (recursively),
+        which have all the tags
+        """
+        if parent_ids:
+            accounts = (a for parent_id in parent_ids for a in self._iter_accounts_for_parent(parent_id))
+        else:
+            accounts = self._paginate('list_accounts', 'Accounts')
+
+        accounts = (a for a in accounts if a.get('Status', 'ACTIVE') == 'ACTIVE')
+
+        if not tags:
+            yield from accounts
+            return
+
+        # The tags are requested by account, so they are resolved concurrently page by page
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for page in _chunks(accounts, self.max_workers * 4):
+                for account, account_tags in zip(page, executor.map(self._account_tags, page)):
+                    if all(account_tags.get(k) == v for k, v in tags.items()):
+                        yield account
+
+    def _iter_accounts_for_parent(self, parent_id: str) -> Iterator[Dict]:
+        yield from self._paginate('list_accounts_for_parent', 'Accounts', ParentId=parent_id)
+
+        for unit in self._paginate('list_organizational_units_for_parent', 'OrganizationalUnits', ParentId=parent_id):
+            yield from self._iter_accounts_for_parent(unit['Id'])
+
+    def _account_tags(self, account: Dict) -> Dict[str, str]:
+        tags = self._paginate('list_tags_for_resource', 'Tags', ResourceId=account['Id'])
+        return {t['Key']: t['Value'] for t in tags}
+
+    def _paginate(self, operation: str, key: str, **kwargs) -> Iterator[Dict]:
+        paginator = self.boto_organizations_client.get_paginator(operation)
+
+        for page in paginator.paginate(**kwargs):
+            yield from page.get(key, [])
+
+
+def _chunks(iterable, size: int) -> Iterator[List]:
+    chunk = []
+
+    for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
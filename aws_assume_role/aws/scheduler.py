@@ -0,0 +1,245 @@
+import functools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, Callable
+
+from aws_assume_role.aws.session_duration import is_session_duration_error
+from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.exceptions import RequestDeadlineExceededException
+
+THROTTLING_ERROR_CODES = frozenset([
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+    'PriorRequestNotComplete',
+])
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+
+
+class TokenBucket:
+    """
+    Allow rate requests per second, with bursts of up to capacity requests
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+
+                wait = (1 - self._tokens) / self.rate
+
+            if now + wait > deadline:
+                return False
+
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit of the in-flight requests: it grows by one after each limit of successful requests and it's halved
+    on each throttled response
+    """
+
+    def __init__(self, initial_limit: int, max_limit: int):
+        self.limit = float(initial_limit)
+        self.max_limit = max_limit
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, deadline: float) -> bool:
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                timeout = deadline - time.monotonic()
+
+                if timeout <= 0 or not self._condition.wait(timeout):
+                    return False
+
+            self._in_flight += 1
+            return True
+
+    def release(self, throttled: bool):
+        with self._condition:
+            self._in_flight -= 1
+
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+
+class RetryBudget:
+    """
+    Shared amount of retries: each retry withdraws one token and each success refunds a fraction of it
+    """
+
+    def __init__(self, capacity: int, refund: float = 0.1):
+        self.capacity = capacity
+        self.refund = refund
+        self._tokens = float(capacity)
+        self._lock = threading.Lock()
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(float(self.capacity), self._tokens + self.refund)
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    retries: int = 0
+    throttles: int = 0
+    failures: int = 0
+    queue_time: float = 0.0
+    service_time: float = 0.0
+
+    def summary(self) -> str:
+        return (f'{self.requests} STS requests ({self.retries} retries, {self.throttles} throttled, '
+                f'{self.failures} failed), {self.queue_time:.3f}s queued, {self.service_time:.3f}s in service')
+
+
+class ScheduledClient:
+    """
+    Proxy of a boto client whose operations are run through the scheduler, each one as a single request
+    """
+
+    def __init__(self, client, scheduler: 'StsRequestScheduler', profile: Profile):
+        self.client = client
+        self.scheduler = scheduler
+        self.profile = profile
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        return functools.partial(self.scheduler.execute, self.profile, attribute)
+
+
+class StsRequestScheduler:
+    """
+    Throttle-aware scheduler of every STS request of the StsClient created with it, with a token bucket rate limiter
+    and an adaptive concurrency limit per source profile and region, jittered exponential backoff over a global retry
+    budget and per-request deadlines. The scheduler owns the retries, the botocore clients of the StsClient only make
+    one attempt
+    """
+
+    def __init__(self, rate: float = 10, max_concurrency: int = 8, max_attempts: int = 5,
+                 retry_budget: int = 20, timeout: float = 60, base_delay: float = 0.2, max_delay: float = 10):
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.retry_budget = RetryBudget(retry_budget)
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = SchedulerStats()
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._limiters: Dict[Hashable, AdaptiveConcurrencyLimiter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_configuration(configuration: Configuration):
+        return StsRequestScheduler(configuration.sts_rate_limit, configuration.sts_max_concurrency,
+                                   configuration.sts_max_attempts, configuration.sts_retry_budget,
+                                   configuration.sts_request_timeout)
+
+    def execute(self, profile: Profile, operation: Callable, *args, **kwargs):
+        """
+        Run one STS request of the profile, retrying it while it's throttled
+        """
+        deadline = time.monotonic() + self.timeout
+        bucket, limiter = self._controls(self._source_key(profile))
+        attempt = 0
+
+        while True:
+            attempt += 1
+            queued_at = time.monotonic()
+
+            if not bucket.acquire(deadline) or not limiter.acquire(deadline):
+                self._record(failures=1, queue_time=time.monotonic() - queued_at)
+                raise RequestDeadlineExceededException(f'Request of {profile.name} has not been scheduled on time')
+
+            started_at = time.monotonic()
+            throttled = False
+
+            try:
+                response = operation(*args, **kwargs)
+            except BaseException as e:
+                throttled = is_throttling_error(e)
+                delay = self._backoff(attempt)
+
+                if not throttled or attempt >= self.max_attempts or time.monotonic() + delay > deadline \
+                        or not self.retry_budget.withdraw():
+                    # The rejected durations of the auto session duration are expected, not failures
+                    self._record(requests=1, throttles=int(throttled), failures=int(not is_session_duration_error(e)),
+                                 queue_time=started_at - queued_at, service_time=time.monotonic() - started_at)
+                    raise
+            else:
+                self.retry_budget.deposit()
+                self._record(requests=1, queue_time=started_at - queued_at, service_time=time.monotonic() - started_at)
+                return response
+            finally:
+                limiter.release(throttled)
+
+            self._record(requests=1, retries=1, throttles=1, queue_time=started_at - queued_at,
+                         service_time=time.monotonic() - started_at)
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def _source_key(profile: Profile) -> Hashable:
+        return profile.aws_profile, profile.sts_region
+
+    def _controls(self, key: Hashable):
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate, max(1.0, self.rate))
+                self._limiters[key] = AdaptiveConcurrencyLimiter(self.max_concurrency, self.max_concurrency)
+
+            return self._buckets[key], self._limiters[key]
+
+    def _record(self, requests: int = 0, retries: int = 0, throttles: int = 0, failures: int = 0,
+                queue_time: float = 0.0, service_time: float = 0.0):
+        with self._lock:
+            self.stats.requests += requests
+            self.stats.retries += retries
+            self.stats.throttles += throttles
+            self.stats.failures += failures
+            self.stats.queue_time += queue_time
+            self.stats.service_time += service_time
@@ -0,0 +1,66 @@
+import time
+from pathlib import Path
+from typing import Optional, List
+
+from aws_assume_role.configuration import Configuration
+from aws_assume_role.utils.file_utils import read_json_file, write_json_file
+
+AUTO_SESSION_DURATION = 'auto'
+
+# Steps to find the role MaxSessionDuration (seconds), from the longest. The setting accepts any value between 3600 and
+# 43200, and the first accepted step is used: each probe issues a session, so the duration isn't refined further
+MAX_SESSION_DURATIONS = (43200, 28800, 14400, 7200, 3600)
+
+# The role chaining limits the session to one hour, whatever the MaxSessionDuration of the role
+CHAINED_SESSION_DURATION = 3600
+
+
+def is_session_duration_error(error: BaseException) -> bool:
+    response = getattr(error, 'response', None) or {}
+    error = response.get('Error', {})
+
+    return error.get('Code') == 'ValidationError' and 'DurationSeconds' in error.get('Message', '')
+
+
+def session_duration_candidates(known: Optional[int]) -> List[int]:
+    """
+    Durations to request from the longest, starting with the known one, if any, in case it has been lowered
+    """
+    if known is None:
+        return list(MAX_SESSION_DURATIONS)
+
+    return [known] + [d for d in MAX_SESSION_DURATIONS if d < known]
+
+
+class SessionDurationCache:
+    """
+    Discovered MaxSessionDuration per role ARN, valid during the ttl (seconds)
+    """
+
+    def __init__(self, path: Path, ttl: int):
+        self.path = path
+        self.ttl = ttl
+
+    @staticmethod
+    def from_configuration(configuration: Configuration):
+        return SessionDurationCache(configuration.cache_dir_path/'session_durations.json',
+                                    configuration.session_duration_cache_ttl)
+
+    def get(self, role_arn: str) -> Optional[int]:
+        entry = self._read().get(role_arn)
+
+        if entry is None or entry.get('discovered_at', 0) + self.ttl <= time.time():
+            return None
+
+        return entry.get('duration')
+
+    def put(self, role_arn: str, duration: int):
+        now = time.time()
+
+        entries = {k: v for k, v in self._read().items() if v.get('discovered_at', 0) + self.ttl > now}
+        entries[role_arn] = {'duration': duration, 'discovered_at': now}
+
+        write_json_file(self.path, entries)
+
+    def _read(self) -> dict:
+        return read_json_file(self.path) or {}
@@ -1,42 +1,171 @@
-from typing import Callable
+from typing import Callable, Optional, TYPE_CHECKING
 
-import boto3
-from botocore.exceptions import BotoCoreError
-
-from aws_assume_role.aws import default_boto_client_factory
+from aws_assume_role.aws import default_boto_client_factory, credentials_fingerprint
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.aws.endpoints import StsEndpointResolver, AUTO_REGION, is_endpoint_error
+from aws_assume_role.aws.identity_cache import IdentityCache
+from aws_assume_role.aws.mfa_session import MfaSessionProvider
+from aws_assume_role.aws.scheduler import ScheduledClient, StsRequestScheduler
+from aws_assume_role.aws.session_duration import SessionDurationCache, AUTO_SESSION_DURATION, \
+    CHAINED_SESSION_DURATION, is_session_duration_error, session_duration_candidates
 from aws_assume_role.configuration import Configuration, Profile
 from aws_assume_role.exceptions import InvalidCredentialsException, InvalidAccountIdException
+from aws_assume_role.tracing import span
+
+if TYPE_CHECKING:
+    import boto3
 
 
 class StsClient:
 
-    def __init__(self, boto_sts_client_factory: Callable[[Profile], boto3.client], landing_account_id: str):
+    def __init__(self, boto_sts_client_factory: Callable[[Profile, Optional[AuthorizationDetails]], 'boto3.client'],
+                 landing_account_id: str,
+                 identity_cache: Optional[IdentityCache] = None, verify_identity: bool = False,
+                 session_duration_cache: Optional[SessionDurationCache] = None,
+                 mfa_session_provider: Optional[MfaSessionProvider] = None,
+                 request_scheduler: Optional[StsRequestScheduler] = None):
         self.boto_sts_client_factory = boto_sts_client_factory
         self.landing_account_id = landing_account_id
+        self.identity_cache = identity_cache
+        self.verify_identity = verify_identity
+        self.session_duration_cache = session_duration_cache
+        self.mfa_session_provider = mfa_session_provider
+        self.request_scheduler = request_scheduler
+        self.endpoint_resolver: Optional[StsEndpointResolver] = None
 
     @staticmethod
-    def from_default_factory(configuration: Configuration):
+    def from_default_factory(configuration: Configuration, identity_cache: Optional[IdentityCache] = None,
+                             verify_identity: bool = False,
+                             session_duration_cache: Optional[SessionDurationCache] = None,
+                             mfa_session_provider: Optional[MfaSessionProvider] = None,
+                             request_scheduler: Optional[StsRequestScheduler] = None):
+
+        endpoint_resolver = StsEndpointResolver.from_configuration(configuration)
+        sts_client = StsClient(None, configuration.aws_landing_account_id, identity_cache, verify_identity,
+                               session_duration_cache, mfa_session_provider, request_scheduler)
+
+        def factory_wrapper(profile: Profile, credentials: Optional[AuthorizationDetails] = None):
+            region_name, endpoint_url = endpoint_resolver.resolve(profile)
+            # When the requests are scheduled, the retries are owned by the scheduler instead of botocore
+            max_attempts = 1 if request_scheduler is not None else None
 
-        def factory_wrapper(profile: Profile):
-            return default_boto_client_factory('sts', profile, configuration)
+            return default_boto_client_factory('sts', profile, configuration, region_name, endpoint_url, credentials,
+                                               max_attempts)
 
-        return StsClient(factory_wrapper, configuration.aws_landing_account_id)
+        sts_client.boto_sts_client_factory = factory_wrapper
+        sts_client.endpoint_resolver = endpoint_resolver
+        return sts_client
 
-    def assume(self, profile: Profile):
+    def assume(self, profile: Profile, source_details: Optional[AuthorizationDetails] = None):
+        """
+        Assume the role of the profile with the credentials of its aws profile, or with the credentials of the
+        previous hop when the profile is chained to a source profile. With a MFA device, the credentials of the aws
+        profile are only used to get the shared MFA session
+        """
+        while True:
+            region = self._auto_region(profile)
 
-        sts_client = self.boto_sts_client_factory(profile)
+            try:
+                return self._assume(profile, source_details)
+            except BaseException as e:
+                # An unreachable auto region is dropped for the next fastest one, or the botocore default
+                if region is None or not is_endpoint_error(e):
+                    raise
 
-        if not self._can_assume(sts_client):
+                self.endpoint_resolver.region_failed(region)
+
+    def _assume(self, profile: Profile, source_details: Optional[AuthorizationDetails]):
+        with span('sts.client', aws_profile=profile.aws_profile):
+            sts_client = self._client(profile, source_details)
+
+        # Only the landing credentials are verified, the chained hops come from an already verified assume
+        if source_details is None and not self._can_assume(sts_client, profile):
             raise InvalidAccountIdException('Invalid Account id')
 
-        return sts_client.assume_role(
-            RoleArn=f'arn:aws:iam::{profile.account_id}:role/{profile.role_name}',
-            RoleSessionName=profile.name
-        )
+        if source_details is None and profile.mfa_serial is not None and self.mfa_session_provider is not None:
+            mfa_details = self.mfa_session_provider.session(profile, sts_client)
+
+            with span('sts.client', aws_profile=profile.aws_profile, mfa=True):
+                sts_client = self._client(profile, mfa_details)
+
+        role_arn = f'arn:aws:iam::{profile.account_id}:role/{profile.role_name}'
+        chained = source_details is not None
+
+        with span('sts.assume_role', profile=profile.name):
+            if profile.duration_seconds is None:
+                return sts_client.assume_role(RoleArn=role_arn, RoleSessionName=profile.name)
+
+            if profile.duration_seconds.lower() == AUTO_SESSION_DURATION:
+                return self._assume_role_auto_duration(sts_client, profile, role_arn, chained)
+
+            duration = int(profile.duration_seconds)
+
+            return sts_client.assume_role(RoleArn=role_arn, RoleSessionName=profile.name,
+                                          DurationSeconds=min(duration, CHAINED_SESSION_DURATION) if chained
+                                          else duration)
+
+    def _auto_region(self, profile: Profile) -> Optional[str]:
+        if self.endpoint_resolver is None or profile.sts_region != AUTO_REGION or profile.sts_endpoint_url is not None:
+            return None
+
+        return self.endpoint_resolver.fastest_region()
+
+    def _client(self, profile: Profile, credentials: Optional[AuthorizationDetails]):
+        client = self.boto_sts_client_factory(profile, credentials)
+
+        if self.request_scheduler is not None:
+            return ScheduledClient(client, self.request_scheduler, profile)
+
+        return client
+
+    def _assume_role_auto_duration(self, sts_client, profile: Profile, role_arn: str, chained: bool):
+        """
+        Request the longest session allowed by the role: back off through the durations on each ValidationError and
+        cache the first accepted one per role ARN
+        """
+        if chained:
+            return sts_client.assume_role(RoleArn=role_arn, RoleSessionName=profile.name,
+                                          DurationSeconds=CHAINED_SESSION_DURATION)
+
+        known = self.session_duration_cache.get(role_arn) if self.session_duration_cache is not None else None
+        candidates = session_duration_candidates(known)
+
+        for index, duration in enumerate(candidates):
+            try:
+                response = sts_client.assume_role(RoleArn=role_arn, RoleSessionName=profile.name,
+                                                  DurationSeconds=duration)
+            except BaseException as e:
+                if not is_session_duration_error(e) or index == len(candidates) - 1:
+                    raise
+
+                continue
+
+            if self.session_duration_cache is not None and duration != known:
+                self.session_duration_cache.put(role_arn, duration)
+
+            return response
+
+    def _can_assume(self, sts_client, profile: Profile) -> bool:
+        from botocore.exceptions import BotoCoreError
 
-    def _can_assume(self, sts_client) -> bool:
         try:
-            response = sts_client.get_caller_identity()
-            return self.landing_account_id is None or response['Account'] == self.landing_account_id
+            fingerprint = credentials_fingerprint(sts_client) if self.identity_cache is not None else None
+
+            if fingerprint is not None and not self.verify_identity:
+                account = self.identity_cache.get(profile.aws_profile, fingerprint)
+
+                if account is not None:
+                    return self._is_landing_account(account)
+
+            with span('sts.get_caller_identity', aws_profile=profile.aws_profile):
+                response = sts_client.get_caller_identity()
+
+            if fingerprint is not None:
+                self.identity_cache.put(profile.aws_profile, fingerprint, response['Account'])
+
+            return self._is_landing_account(response['Account'])
         except BotoCoreError as e:
             raise InvalidCredentialsException from e
+
+    def _is_landing_account(self, account: str) -> bool:
+        return self.landing_account_id is None or account == self.landing_account_id
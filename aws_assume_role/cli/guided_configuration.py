@@ -127,7 +127,7 @@ class CmdConfiguration(cmd.Cmd):
             return next(args), next(args), next(args, None), next(args, None)
 
         profile = StoredProfile(*parse_args(arg))
-        self.config.stored_profiles.append(profile)
+        self.config.add_profile(profile)
 
     def do_edit_profile(self, arg: str):
         """Create new Profile on config: edit_profile NAME KEY VALUE"""
@@ -142,13 +142,11 @@ class CmdConfiguration(cmd.Cmd):
 
         name, key, value = parse_args(arg)
 
-        profile = self.config.find_stored_profile(name)
-
-        if profile is None:
+        if self.config.find_stored_profile(name) is None:
             self._write_line(f"Unknown profile: {name}")
             return
 
-        profile[key] = value
+        self.config.edit_profile(name, key, value)
 
     def do_remove_profile(self, name: str):
         """Remove a Profile from config: remove_profile NAME"""
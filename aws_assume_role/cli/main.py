@@ -1,16 +1,41 @@
 import argparse
+import getpass
+import json
+import os
+import re
+import secrets
+import shlex
+import sys
 from argparse import Namespace
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import List, Optional, Tuple
 
-from aws_assume_role import configuration
+from aws_assume_role import configuration, tracing
 from aws_assume_role.authentication import Authorizer, AuthorizationWriter
+from aws_assume_role.authentication.authorization_cache import AuthorizationCache
 from aws_assume_role.authentication.authorization_writer import SessionEnvAuthorizationWriter, \
-    ConfigFileAuthorizationWriter
+    ConfigFileAuthorizationWriter, ProcessCredentialsAuthorizationWriter, EnvSnapshotAuthorizationWriter
+from aws_assume_role.aws.config_file import write_credential_process
+from aws_assume_role.aws.credentials_file import read_credentials_status
+from aws_assume_role.aws.identity_cache import IdentityCache
+from aws_assume_role.aws.mfa_session import MfaSessionProvider, MfaSessionCache
+from aws_assume_role.aws.scheduler import StsRequestScheduler
+from aws_assume_role.aws.session_duration import SessionDurationCache
 from aws_assume_role.aws.sts import StsClient
 from aws_assume_role.cli.guided_configuration import CmdConfiguration
+from aws_assume_role.cli.shell_hook import render_shell_hook, SHELLS
+from aws_assume_role.cli.sinks import create_sinks_writer, SINKS_HELP
+from aws_assume_role.cli.exceptions import InvalidArgumentsException
 from aws_assume_role.configuration import Configuration
-from aws_assume_role.exceptions import ConfigurationNotFoundException
+from aws_assume_role.exceptions import ConfigurationNotFoundException, ProfileNotConfiguredException, \
+    SinkWriteException, AccountSyncConflictException
 from aws_assume_role.manager import ProfileAuthenticationManager
+from aws_assume_role.profile_index import load_profile_index
+from aws_assume_role.usage_history import UsageHistory
+
+SINGLE_PROFILE_OUTPUT_ERROR = 'The --session, --process and --sink exports flags only can export the credentials of ' \
+                              'a single profile'
 
 
 def _get_parser():
@@ -24,21 +49,156 @@ def _get_parser():
                         help='Start the configuration process and ignore other parameters')
 
     parser.add_argument('-l', '--list', action='store_true',
-                        help='List all profiles')
+                        help='List all profiles, or the ones matching the --prefix, --search, --account-id, '
+                             '--role-name and --aws-profile filters')
+
+    parser.add_argument('--prefix', action='store',
+                        help='List the profiles whose name starts with the prefix')
+
+    parser.add_argument('--search', action='store', metavar='QUERY',
+                        help='List the profiles whose name contains the query characters in order, best matches '
+                             'first')
+
+    parser.add_argument('--account-id', action='store',
+                        help='List the profiles of the account')
+
+    parser.add_argument('--aws-profile', action='store',
+                        help='List the profiles assumed from the aws profile')
+
+    parser.add_argument('--output', action='store', choices=('text', 'json', 'ndjson'), default='text',
+                        help='Output format of --list (default: text)')
+
+    parser.add_argument('--process', action='store_true',
+                        help='Not modify the aws config file and print the credentials as credential_process output')
+
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Not modify the aws config file and only write the env snapshot of the profile')
+
+    parser.add_argument('--sink', action='append', metavar='SINK', default=[],
+                        help=f'Write the credentials on the sink instead of the aws credentials file: {SINKS_HELP}. '
+                             'Can be repeated, the sinks are written concurrently (default: the sinks setting)')
+
+    parser.add_argument('--shell-hook', action='store', choices=SHELLS,
+                        help='Print the aws_assume shell function, which loads the env snapshot of a profile without '
+                             'running this program while the snapshot is fresh')
+
+    parser.add_argument('--status', action='store_true',
+                        help='Show the remaining lifetime of the credentials of the profiles on the credentials file')
+
+    parser.add_argument('--refresh-expiring', action='store_true',
+                        help='Assume again only the profiles whose credentials are missing, expired or expire within '
+                             'the --within duration')
+
+    parser.add_argument('--within', action='store', type=duration_argument, default=900, metavar='DURATION',
+                        help='Expiration window of --status, --refresh-expiring and --prefetch, like 900, 90s, 15m '
+                             'or 1h (default: 15m)')
+
+    parser.add_argument('--prune-expired', action='store_true',
+                        help='Remove the expired sections of the credentials file on the same write')
+
+    parser.add_argument('--prefetch', action='store_true',
+                        help='Refresh in parallel the credentials of the most used profiles which expire within the '
+                             '--within duration, to run from cron or a login hook')
+
+    parser.add_argument('--top', action='store', type=int, default=5,
+                        help='Number of most used profiles refreshed by --prefetch (default: 5)')
+
+    parser.add_argument('--stats', action='store_true',
+                        help='Show the uses and the p50/p95 assume latency of each profile')
+
+    parser.add_argument('--install-process', action='store_true',
+                        help='Configure the profiles on the aws config file to get the credentials through '
+                             'credential_process, calling this program with the --process flag')
+
+    parser.add_argument('--agent', action='store_true',
+                        help='Keep the credentials of the profiles refreshed and serve them on a local http endpoint '
+                             'compatible with AWS_CONTAINER_CREDENTIALS_FULL_URI')
+
+    parser.add_argument('--agent-port', action='store', type=int, default=8765,
+                        help='Localhost port of the agent endpoint (default: 8765)')
+
+    parser.add_argument('--agent-socket', action='store',
+                        help='Serve the agent endpoint on this unix socket instead of a localhost port')
+
+    parser.add_argument('--sync-accounts', action='store_true',
+                        help='Create or update the profiles from the accounts of the AWS Organization of the landing '
+                             'profile')
+
+    parser.add_argument('--name-template', action='store', default='{name}',
+                        help='Profile name of the synced accounts, using {id}, {name}, {raw_name} and {email} '
+                             '(default: {name})')
+
+    parser.add_argument('--ou', action='append', metavar='OU_ID', default=[],
+                        help='Only sync the accounts under the organizational unit (can be repeated)')
+
+    parser.add_argument('--tag', action='append', type=tag_argument, metavar='KEY=VALUE', default=[],
+                        help='Only sync the accounts with the tag (can be repeated)')
+
+    parser.add_argument('--role-name', action='store',
+                        help='Role name of the synced profiles (default: the aws_default_role_name), or filter of '
+                             '--list')
+
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Show the changes of --sync-accounts without saving them')
 
     parser.add_argument('-r', '--region', action='store',
                         help='Override the region parameter over the configuration file')
 
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Not read or store the assumed credentials on the local cache')
+
+    parser.add_argument('--force-refresh', action='store_true',
+                        help='Ignore the cached credentials and assume the role again, refreshing the cache')
+
+    parser.add_argument('--mfa-code', action='store',
+                        help='Code of the MFA device to get a new MFA session, instead of prompting it when needed')
+
+    parser.add_argument('--verify-identity', action='store_true',
+                        help='Verify the landing account identity against AWS, ignoring the cached verification')
+
+    parser.add_argument('--all', action='store_true',
+                        help='Assume all the profiles on your config file')
+
+    parser.add_argument('--match', action='append', metavar='PATTERN', default=[],
+                        help='Assume all the profiles whose name matches the glob pattern (can be repeated)')
+
+    parser.add_argument('--workers', action='store', type=int, default=8,
+                        help='Maximum number of profiles assumed concurrently (default: 8)')
+
+    parser.add_argument('--trace', action='store_true',
+                        help='Print the timing breakdown of the execution phases on stderr')
+
+    parser.add_argument('--trace-file', action='store',
+                        help='Write the timing spans of the execution phases as JSON on this file')
+
     parser.add_argument('--config-path', action='store', default=str(configuration.default_config_file_path()),
                         help='Set the configuration file path (default: {})'
                              .format(configuration.default_config_file_path()))
 
-    parser.add_argument('profile', metavar='profile', nargs='?',
-                        help='The profile name on your config file')
+    parser.add_argument('profile', metavar='profile', nargs='*',
+                        help='The profile names on your config file')
 
     return parser
 
 
+def duration_argument(value: str) -> int:
+    match = re.fullmatch(r'(\d+)([smh]?)', value.strip())
+
+    if match is None:
+        raise argparse.ArgumentTypeError(f'Invalid duration {value}, use seconds or a s/m/h suffix, like 15m')
+
+    return int(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+def tag_argument(value: str) -> Tuple[str, str]:
+    key, separator, tag_value = value.partition('=')
+
+    if separator == '' or key == '':
+        raise argparse.ArgumentTypeError(f'Invalid tag {value}, use KEY=VALUE, like env=prod')
+
+    return key, tag_value
+
+
 def start_configuration(args: Namespace):
 
     config_path = Path(args.config_path)
@@ -57,6 +217,34 @@ def start_configuration(args: Namespace):
         print("\nDiscard changes! By!")
 
 
+def get_authorizer(args: Namespace, config: Configuration, writer: AuthorizationWriter,
+                   refresh_margin: Optional[int] = None) -> Authorizer:
+    identity_cache = None if args.no_cache else IdentityCache.from_configuration(config)
+    session_duration_cache = None if args.no_cache else SessionDurationCache.from_configuration(config)
+    mfa_cache = None if args.no_cache else MfaSessionCache.from_configuration(config)
+    mfa_session_provider = MfaSessionProvider(mfa_token_provider(args), config.mfa_session_duration, mfa_cache)
+    sts_client = StsClient.from_default_factory(config, identity_cache, args.verify_identity, session_duration_cache,
+                                                mfa_session_provider, StsRequestScheduler.from_configuration(config))
+    cache = None if args.no_cache else AuthorizationCache.from_configuration(config)
+
+    if cache is not None and refresh_margin is not None:
+        cache.refresh_margin = max(cache.refresh_margin, refresh_margin)
+
+    return Authorizer(sts_client, config, writer, cache)
+
+
+def mfa_token_provider(args: Namespace):
+
+    def provide(mfa_serial: str) -> str:
+        if args.mfa_code:
+            return args.mfa_code
+
+        # getpass prompts on the terminal, so it works even when the stdout is read by the SDKs (--process)
+        return getpass.getpass(f'MFA code of {mfa_serial}: ')
+
+    return provide
+
+
 def start_authorization(args: Namespace):
 
     config_path = Path(args.config_path)
@@ -65,44 +253,412 @@ def start_authorization(args: Namespace):
         raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
 
     config = configuration.read_config(config_path)
-    sts_client = StsClient.from_default_factory(config)
     writer = get_authorization_writer(args, config)
-    authorizer = Authorizer(sts_client, config, writer)
+    authorizer = get_authorizer(args, config, writer)
 
-    manager = ProfileAuthenticationManager(authorizer, writer, config)
-    manager.init_job(args.profile, args.region)
+    manager = ProfileAuthenticationManager(authorizer, writer, config, get_snapshot_writer(args, config),
+                                           UsageHistory.from_configuration(config))
+
+    try:
+        if is_batch(args):
+            results = manager.init_jobs(get_profile_names(args, config), args.region, args.force_refresh,
+                                        args.workers)
+            print(authorizer.sts_client.request_scheduler.stats.summary())
+            report_batch_results(results)
+        else:
+            manager.init_job(args.profile[0], args.region, args.force_refresh)
+    except SinkWriteException as e:
+        report_sink_failures(e)
+
+
+def get_status_profile_names(args: Namespace, config: Configuration) -> List[str]:
+    if is_batch(args) or len(args.profile) > 0:
+        return get_profile_names(args, config)
+
+    return [p.name for p in config.stored_profiles]
+
+
+def format_remaining(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+
+    sign = '-' if seconds < 0 else ''
+    minutes, _ = divmod(int(abs(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return f'{sign}{hours}h{minutes:02d}m'
+
+
+def format_latency(seconds: Optional[float]) -> str:
+    return '-' if seconds is None else f'{seconds * 1000:.1f}ms'
+
+
+def print_credentials_status(args: Namespace):
+    config_path = Path(args.config_path)
+
+    if not config_path.exists():
+        raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
+
+    config = configuration.read_config(config_path)
+    statuses = read_credentials_status(config.aws_credentials_file_path, get_status_profile_names(args, config))
+    now = datetime.now(timezone.utc)
+
+    width = max([len(s.name) for s in statuses] + [len('profile')])
+    print(f'{"profile":<{width}}  {"state":<8}  remaining')
+
+    for status in statuses:
+        print(f'{status.name:<{width}}  {status.state(now, args.within):<8}  {format_remaining(status.remaining(now))}')
+
+
+def refresh_expiring(args: Namespace):
+    config_path = Path(args.config_path)
+
+    if not config_path.exists():
+        raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
+
+    config = configuration.read_config(config_path)
+    statuses = read_credentials_status(config.aws_credentials_file_path, get_status_profile_names(args, config))
+    now = datetime.now(timezone.utc)
+
+    names = [s.name for s in statuses if s.needs_refresh(now, args.within)]
+
+    writer = ConfigFileAuthorizationWriter(config, args.prune_expired)
+    authorizer = get_authorizer(args, config, writer)
+    manager = ProfileAuthenticationManager(authorizer, writer, config, get_snapshot_writer(args, config),
+                                           UsageHistory.from_configuration(config))
+
+    # The local cache can hold the same credentials which are about to expire, so they're always assumed again
+    results = manager.init_jobs(names, args.region, True, args.workers)
+
+    print(f'{len(statuses) - len(names)} profiles valid for more than {format_remaining(args.within)}')
+
+    for name in writer.pruned:
+        print(f'{name}: pruned')
+
+    report_batch_results(results)
+
+
+def prefetch(args: Namespace):
+    config_path = Path(args.config_path)
+
+    if not config_path.exists():
+        raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
+
+    config = configuration.read_config(config_path)
+    usage_history = UsageHistory.from_configuration(config)
+    ranking = usage_history.rank()
+
+    names = [name for name, _ in ranking if config.find_profile(name) is not None][:args.top]
+
+    writer = get_authorization_writer(args, config)
+    # Only the cached credentials which expire within the window are assumed again
+    authorizer = get_authorizer(args, config, writer, args.within)
+    manager = ProfileAuthenticationManager(authorizer, writer, config, get_snapshot_writer(args, config),
+                                           usage_history)
+
+    try:
+        results = manager.init_jobs(names, args.region, args.force_refresh, args.workers)
+    except SinkWriteException as e:
+        report_sink_failures(e)
+
+    print(authorizer.sts_client.request_scheduler.stats.summary())
+    report_batch_results(results)
+
+
+def print_usage_stats(args: Namespace):
+    config_path = Path(args.config_path)
+
+    if not config_path.exists():
+        raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
+
+    config = configuration.read_config(config_path)
+    stats = UsageHistory.from_configuration(config).latency_stats()
+
+    width = max([len(name) for name in stats] + [len('profile')])
+    print(f'{"profile":<{width}}  {"uses":>6}  {"cached":>6}  {"p50":>9}  {"p95":>9}')
+
+    for name, (uses, hits, p50, p95) in stats.items():
+        print(f'{name:<{width}}  {uses:>6}  {hits:>6}  {format_latency(p50):>9}  {format_latency(p95):>9}')
+
+
+def start_agent(args: Namespace):
+    # The http server is only needed by the agent, keep it out of the startup of the other commands
+    from aws_assume_role.agent import CredentialAgent, create_agent_server
+
+    config_path = Path(args.config_path)
+
+    if not config_path.exists():
+        raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
+
+    config = configuration.read_config(config_path)
+    writer = get_authorization_writer(args, config)
+    authorizer = get_authorizer(args, config, writer)
+
+    profiles = []
+
+    for name in get_profile_names(args, config):
+        profile = config.find_profile(name)
+
+        if profile is None:
+            raise ProfileNotConfiguredException(f"For profile {name}")
+
+        profiles.append(profile)
+
+    if len(profiles) == 0:
+        raise InvalidArgumentsException('No profile matches, the agent would not serve any credentials')
+
+    token = os.environ.get('ASSUME_AWS_AGENT_TOKEN') or secrets.token_urlsafe(32)
+
+    agent = CredentialAgent(authorizer, profiles, config.agent_refresh_margin)
+    server = create_agent_server(agent, token, args.agent_port, args.agent_socket)
+
+    if args.agent_socket is None:
+        print(f'Serving credentials on http://127.0.0.1:{server.server_address[1]}/<profile>')
+        print(f'export AWS_CONTAINER_CREDENTIALS_FULL_URI="http://127.0.0.1:{server.server_address[1]}/<profile>"')
+    else:
+        print(f'Serving credentials on unix socket {args.agent_socket}, path /<profile>')
+
+    print(f'export AWS_CONTAINER_AUTHORIZATION_TOKEN="{token}"')
+
+    agent.start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping agent! By!")
+    finally:
+        server.server_close()
+        agent.stop()
+
+
+def is_batch(args: Namespace) -> bool:
+    return args.all or len(args.match) > 0 or len(args.profile) > 1
+
+
+def is_single_profile_output(args: Namespace) -> bool:
+    return args.session or args.process or 'exports' in args.sink
+
+
+def get_profile_names(args: Namespace, config: Configuration) -> List[str]:
+
+    if args.all:
+        return [p.name for p in config.stored_profiles]
+
+    names = list(args.profile)
+
+    for pattern in args.match:
+        names.extend(p.name for p in config.match_stored_profiles(pattern))
+
+    return list(dict.fromkeys(names))
+
+
+def report_batch_results(results):
+
+    failures = 0
+
+    for name, error in results.items():
+        if error is None:
+            print(f'{name}: OK')
+        else:
+            failures += 1
+            print(f'{name}: FAILED ({error.__class__.__name__}: {error})')
+
+    print(f'{len(results) - failures} assumed, {failures} failed')
+
+    if failures > 0:
+        sys.exit(1)
+
+
+def report_sink_failures(error: SinkWriteException):
+
+    # The stdout can be evaluated by the shell (exports sink), the failures go to stderr
+    for name, failure in error.failures.items():
+        print(f'sink {name}: FAILED ({failure.__class__.__name__}: {failure})', file=sys.stderr)
+
+    sys.exit(1)
 
 
 def get_authorization_writer(args: Namespace, config: Configuration) -> AuthorizationWriter:
 
+    if args.snapshot:
+        return EnvSnapshotAuthorizationWriter(config)
+
+    if args.process:
+        return ProcessCredentialsAuthorizationWriter(config)
+
     if args.session:
         return SessionEnvAuthorizationWriter(config)
 
+    sinks = args.sink or [s for s in (config.sinks or '').split(',') if s.strip()]
+
+    if len(sinks) > 0:
+        # The exports are evaluated by the shell, so they only can hold the variables of one profile
+        if (is_batch(args) or args.prefetch) and any(s.strip() == 'exports' for s in sinks):
+            raise InvalidArgumentsException('The exports sink only can export the credentials of a single profile')
+
+        return create_sinks_writer(sinks, config)
+
     return ConfigFileAuthorizationWriter(config)
 
 
-def list_all_profiles(args: Namespace):
+def get_snapshot_writer(args: Namespace, config: Configuration) -> Optional[AuthorizationWriter]:
+
+    # The credential_process output is on the hot path of the SDKs, so it doesn't pay for the snapshots
+    if not config.env_snapshots or args.process or args.snapshot:
+        return None
+
+    return EnvSnapshotAuthorizationWriter(config)
+
+
+def program_command(config_path: Path) -> str:
+    command = 'aws-assume-role'
+    config_path = config_path.expanduser().resolve()
+
+    # The command runs from any directory, through a shell
+    if config_path != configuration.default_config_file_path().expanduser().resolve():
+        command = f'{command} --config-path {shlex.quote(str(config_path))}'
+
+    return command
+
+
+def print_shell_hook(args: Namespace):
+    config_path = Path(args.config_path)
+    config = configuration.read_config(config_path) if config_path.exists() else Configuration(None, None)
+
+    snapshot_dir = EnvSnapshotAuthorizationWriter.snapshot_dir(config)
+
+    print(render_shell_hook(args.shell_hook, snapshot_dir, config.credentials_refresh_margin,
+                            program_command(config_path)))
+
+
+def install_credential_process(args: Namespace):
+    config_path = Path(args.config_path)
+
+    if not config_path.exists():
+        raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
+
+    config = configuration.read_config(config_path)
+    profile_names = get_profile_names(args, config)
+
+    write_credential_process(config, profile_names, program_command(config_path))
+
+    for profile_name in profile_names:
+        print(f'{profile_name}: credential_process configured on {config.aws_config_file_path}')
+
+    print('NOTE: The profiles on the credentials file take precedence over the credential_process setting')
+
+
+def sync_accounts(args: Namespace):
+    from aws_assume_role.account_sync import plan_account_sync, apply_account_sync
+    from aws_assume_role.aws.organizations import OrganizationsClient
+
     config_path = Path(args.config_path)
 
     if not config_path.exists():
         raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
 
     config = configuration.read_config(config_path)
+    accounts = OrganizationsClient.from_default_factory(config).iter_accounts(args.ou, dict(args.tag))
+    plan = plan_account_sync(config, accounts, args.name_template, args.role_name)
+
+    for profile in plan.added:
+        print(f'+ {profile.name} ({profile.account_id})')
+
+    for current, updated in plan.updated:
+        print(f'~ {current.name} ({current.account_id}, {current.role_name} -> '
+              f'{updated.account_id}, {updated.role_name})')
+
+    for name, account_id, taken_by in plan.conflicts:
+        print(f'! {name} ({account_id}): skipped, the name is already used by {taken_by}')
+
+    for account_id in plan.unnamed:
+        print(f'! ({account_id}): skipped, the name template renders an empty name')
+
+    print(f'{len(plan.added)} added, {len(plan.updated)} updated, {plan.unchanged} unchanged')
+
+    if plan.has_conflicts:
+        raise AccountSyncConflictException(f'{len(plan.conflicts) + len(plan.unnamed)} accounts without a unique '
+                                           f'profile name, use a --name-template with {{id}}, like {{name}}-{{id}}')
+
+    if plan.has_changes and not args.dry_run:
+        apply_account_sync(config, plan)
+        configuration.write_config(config_path, config)
+        print(f"Configuration Saved on {config_path}")
+
+
+def list_all_profiles(args: Namespace):
+    config_path = Path(args.config_path)
 
-    for profile in config.stored_profiles:
-        print(profile.name)
+    if not config_path.exists():
+        raise ConfigurationNotFoundException("Config file not found, please, run with the --config flag first!")
+
+    profiles = load_profile_index(config_path).search(args.prefix, args.search, args.account_id, args.role_name,
+                                                      args.aws_profile)
+
+    if args.output == 'json':
+        print(json.dumps([p._asdict() for p in profiles], indent=2))
+    elif args.output == 'ndjson':
+        sys.stdout.write(''.join(json.dumps(p._asdict()) + '\n' for p in profiles))
+    else:
+        sys.stdout.write(''.join(p.name + '\n' for p in profiles))
 
 
 def main():
     parser = _get_parser()
     arguments = parser.parse_args()
 
+    if not arguments.trace and arguments.trace_file is None:
+        run(parser, arguments)
+        return
+
+    tracer = tracing.RecordingTracer()
+    tracing.set_tracer(tracer)
+
+    try:
+        with tracer.span('main'):
+            run(parser, arguments)
+    finally:
+        tracing.set_tracer(None)
+
+        if arguments.trace:
+            print(tracer.summary(), file=sys.stderr)
+
+        if arguments.trace_file is not None:
+            Path(arguments.trace_file).write_text(tracer.to_json(), encoding='utf-8')
+
+
+def run(parser: argparse.ArgumentParser, arguments: Namespace):
+
     if arguments.configure:
         start_configuration(arguments)
     elif arguments.list:
         list_all_profiles(arguments)
-    elif arguments.profile is None:
+    elif arguments.shell_hook is not None:
+        print_shell_hook(arguments)
+    elif arguments.status:
+        print_credentials_status(arguments)
+    elif arguments.refresh_expiring:
+        refresh_expiring(arguments)
+    elif arguments.stats:
+        print_usage_stats(arguments)
+    elif arguments.prefetch:
+        if is_single_profile_output(arguments):
+            parser.error(SINGLE_PROFILE_OUTPUT_ERROR)
+
+        prefetch(arguments)
+    elif arguments.sync_accounts:
+        sync_accounts(arguments)
+    elif arguments.agent:
+        if not arguments.profile and not is_batch(arguments):
+            parser.error("The --agent flag needs the profiles to serve: the profile names, --all or --match")
+
+        start_agent(arguments)
+    elif not arguments.profile and not is_batch(arguments):
         parser.error("You must be define a profile or set the --configure flag. Run flag -h to get more information")
+    elif is_single_profile_output(arguments) and is_batch(arguments):
+        parser.error(SINGLE_PROFILE_OUTPUT_ERROR)
+    elif arguments.install_process:
+        install_credential_process(arguments)
     else:
         start_authorization(arguments)
 
@@ -0,0 +1,43 @@
+import textwrap
+from pathlib import Path
+
+from aws_assume_role.cli.exceptions import InvalidArgumentsException
+
+SHELLS = ('bash', 'zsh', 'fish')
+
+POSIX_HOOK = '''\
+aws_assume() {{
+    local file="{snapshot_dir}/$1.sh" now expires=0
+    now=${{EPOCHSECONDS:-$(date +%s)}}
+    [ -r "$file" ] && read -r _ _ expires _ < "$file"
+    if [ "$((expires - {margin}))" -le "$now" ]; then
+        command {command} --snapshot "$1" > /dev/null || return $?
+    fi
+    . "$file"
+}}
+'''
+
+FISH_HOOK = '''\
+function aws_assume
+    set -l file "{snapshot_dir}/$argv[1].fish"
+    set -l expires 0
+    test -r $file; and read -l _ _ expires _ < $file
+    if test (math $expires - {margin}) -le (date +%s)
+        command {command} --snapshot $argv[1] > /dev/null; or return $status
+    end
+    source $file
+end
+'''
+
+
+def render_shell_hook(shell: str, snapshot_dir: Path, margin: int, command: str) -> str:
+    """
+    Shell function ``aws_assume <profile>`` which sources the env snapshot of the profile, refreshing it through
+    ``<command> --snapshot <profile>`` only when it expires in less than margin seconds
+    """
+    if shell not in SHELLS:
+        raise InvalidArgumentsException(f'Unsupported shell {shell}, use one of {", ".join(SHELLS)}')
+
+    template = FISH_HOOK if shell == 'fish' else POSIX_HOOK
+
+    return textwrap.dedent(template).format(snapshot_dir=snapshot_dir, margin=margin, command=command)
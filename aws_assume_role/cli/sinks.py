@@ -0,0 +1,47 @@
+from typing import List
+
+from aws_assume_role.authentication.authorization_cache import AuthorizationCache
+from aws_assume_role.authentication.authorization_writer import AuthorizationWriter, ConfigFileAuthorizationWriter, \
+    ExportsAuthorizationWriter, DotenvAuthorizationWriter, JsonFileAuthorizationWriter, CacheAuthorizationWriter, \
+    MultiAuthorizationWriter
+from aws_assume_role.cli.exceptions import InvalidArgumentsException
+from aws_assume_role.configuration import Configuration
+
+SINKS_HELP = 'credentials, exports, process-cache, dotenv:PATH or json:PATH'
+
+
+def create_sink_writer(spec: str, config: Configuration) -> AuthorizationWriter:
+    """
+    Writer of a sink spec: ``credentials``, ``exports``, ``process-cache``, ``dotenv:<path>`` or ``json:<path>``. The
+    paths can contain a ``{profile}`` placeholder
+    """
+    kind, _, path = spec.strip().partition(':')
+
+    if kind == 'credentials' and not path:
+        return ConfigFileAuthorizationWriter(config)
+
+    if kind == 'exports' and not path:
+        return ExportsAuthorizationWriter(config)
+
+    if kind == 'process-cache' and not path:
+        return CacheAuthorizationWriter(AuthorizationCache.from_configuration(config))
+
+    if kind == 'dotenv' and path:
+        return DotenvAuthorizationWriter(config, path)
+
+    if kind == 'json' and path:
+        return JsonFileAuthorizationWriter(config, path)
+
+    raise InvalidArgumentsException(f'Invalid sink {spec}, use one of {SINKS_HELP}')
+
+
+def create_sinks_writer(specs: List[str], config: Configuration) -> AuthorizationWriter:
+    """
+    Single writer of the sinks, fanning out the credentials when there is more than one
+    """
+    writers = {spec: create_sink_writer(spec, config) for spec in dict.fromkeys(specs)}
+
+    if len(writers) == 1:
+        return next(iter(writers.values()))
+
+    return MultiAuthorizationWriter(writers)
@@ -1,10 +1,16 @@
 import dataclasses
+import fnmatch
+import hashlib
 import json
 import os
+import pickle
 from pathlib import Path
-from typing import Final, List, Optional, get_type_hints, get_args, Dict
+from typing import Final, List, Optional, get_type_hints, get_args, Dict, Tuple
 
+from aws_assume_role import __version__
 from aws_assume_role.exceptions import ConfigurationNotFoundException
+from aws_assume_role.tracing import span
+from aws_assume_role.utils.file_utils import write_private_file
 from aws_assume_role.utils.typing_utils import is_optional
 
 
@@ -15,6 +21,14 @@ def default_config_file_path() -> Path:
     return Path.home()/CONFIG_FILE_NAME
 
 
+def default_cache_dir_path() -> Path:
+    return Path(os.environ.get('ASSUME_AWS_CACHE_DIR') or Path.home()/'.aws_assume_role'/'cache')
+
+
+def default_aws_profile(aws_landing_profile: Optional[str]) -> Optional[str]:
+    return os.environ.get('ASSUME_AWS_PROFILE') or aws_landing_profile
+
+
 class Dictionable:
 
     def __getitem__(self, item: str):
@@ -30,8 +44,10 @@ class Dictionable:
 
             if isinstance(value, item_type):
                 setattr(self, key, value)
-
-            setattr(self, key, item_type(value))
+            elif item_type is bool and isinstance(value, str):
+                setattr(self, key, value.lower() in ('1', 'true', 'yes', 'on'))
+            else:
+                setattr(self, key, item_type(value))
         else:
 
             setattr(self, key, None)
@@ -46,6 +62,11 @@ class Profile:
     account_id: str
     role_name: str
     aws_profile: str
+    sts_region: Optional[str] = None
+    sts_endpoint_url: Optional[str] = None
+    source_profile: Optional[str] = None
+    duration_seconds: Optional[str] = None
+    mfa_serial: Optional[str] = None
 
 
 @dataclasses.dataclass
@@ -72,6 +93,30 @@ class Configuration(Dictionable):
     aws_landing_profile: str = 'default'
     aws_config_file: Optional[str] = None
     aws_credentials_file: Optional[str] = None
+    cache_dir: Optional[str] = None
+    credentials_refresh_margin: int = 300
+    identity_cache_ttl: int = 3600
+    agent_refresh_margin: int = 900
+    env_snapshots: bool = True
+    sinks: Optional[str] = None
+    usage_history_max_bytes: int = 262144
+    boto_pool_size: int = 16
+    boto_max_pool_connections: int = 10
+    boto_tcp_keepalive: bool = True
+    sts_rate_limit: int = 10
+    sts_max_concurrency: int = 8
+    sts_max_attempts: int = 5
+    sts_retry_budget: int = 20
+    sts_request_timeout: int = 60
+    sts_region: Optional[str] = None
+    sts_endpoint_url: Optional[str] = None
+    sts_candidate_regions: str = 'us-east-1,us-west-2,eu-west-1,eu-central-1,ap-southeast-1'
+    sts_endpoint_ttl: int = 86400
+    duration_seconds: Optional[str] = None
+    session_duration_cache_ttl: int = 604800
+    mfa_serial: Optional[str] = None
+    mfa_session_duration: int = 43200
+    mfa_keyring: bool = False
     stored_profiles: List[StoredProfile] = dataclasses.field(default_factory=list)
 
     @property
@@ -89,19 +134,56 @@ class Configuration(Dictionable):
                or Path.home()/'.aws'/'config'
         return Path(path)
 
+    @property
+    def cache_dir_path(self) -> Path:
+        if self.cache_dir is not None and 'ASSUME_AWS_CACHE_DIR' not in os.environ:
+            return Path(self.cache_dir)
+
+        return default_cache_dir_path()
+
     @property
     def aws_profile(self) -> str:
-        return os.environ.get('ASSUME_AWS_PROFILE') or self.aws_landing_profile
+        return default_aws_profile(self.aws_landing_profile)
 
     @property
     def profiles(self) -> List[Profile]:
         return [self.__from_stored_to_profile(sp) for sp in self.stored_profiles]
 
     def find_stored_profile(self, profile_name: str) -> Optional[StoredProfile]:
-        return next((p for p in self.stored_profiles if p.name == profile_name), None)
+        profile = self._profiles_index().get(profile_name)
+
+        # Renames go through edit_profile, which reindexes. A rename made directly on the profile is only detected when
+        # its old name is looked up, the misses never scan the stored profiles
+        if profile is not None and profile.name != profile_name:
+            self.reindex_profiles()
+            profile = self._profiles_index().get(profile_name)
+
+        return profile
+
+    def match_stored_profiles(self, pattern: str) -> List[StoredProfile]:
+        return [p for p in self.stored_profiles if fnmatch.fnmatchcase(p.name, pattern)]
 
     def find_profile(self, profile_name: str) -> Optional[Profile]:
-        return next((p for p in self.profiles if p.name == profile_name), None)
+        stored_profile = self.find_stored_profile(profile_name)
+
+        if stored_profile is None:
+            return None
+
+        return self.__from_stored_to_profile(stored_profile)
+
+    def add_profile(self, profile: StoredProfile):
+        index = self._profiles_index()
+
+        self.stored_profiles.append(profile)
+        index.setdefault(profile.name, profile)
+        self._profiles_index_size = len(self.stored_profiles)
+
+    def edit_profile(self, profile_name: str, key: str, value):
+        profile = self.find_stored_profile(profile_name)
+        profile[key] = value
+
+        if key == 'name':
+            self.reindex_profiles()
 
     def del_profile(self, profile_name: str):
 
@@ -112,17 +194,38 @@ class Configuration(Dictionable):
                 del self.stored_profiles[i]
                 break
 
+        self.reindex_profiles()
+
+    def reindex_profiles(self):
+        # The first profile wins on duplicated names, like the sequential lookup
+        self._profiles_index_cache = {p.name: p for p in reversed(self.stored_profiles)}
+        self._profiles_index_size = len(self.stored_profiles)
+
+    def _profiles_index(self) -> Dict[str, StoredProfile]:
+
+        # Rebuild it if the stored profiles list has been modified directly
+        if self.__dict__.get('_profiles_index_size') != len(self.stored_profiles):
+            self.reindex_profiles()
+
+        return self._profiles_index_cache
+
     def to_dict(self) -> Dict:
         return {
-            **self.__dict__,
+            **{k: v for k, v in self.__dict__.items() if not k.startswith('_')},
             'stored_profiles': [p.to_dict() for p in self.stored_profiles]
         }
 
     def __from_stored_to_profile(self, stored_profile: StoredProfile) -> Profile:
         role_name = stored_profile.role_name or self.aws_default_role_name
         aws_profile = stored_profile.aws_profile or self.aws_profile
+        sts_region = stored_profile.sts_region or self.sts_region
+        sts_endpoint_url = stored_profile.sts_endpoint_url or self.sts_endpoint_url
+        duration_seconds = stored_profile.duration_seconds or self.duration_seconds
+        mfa_serial = stored_profile.mfa_serial or self.mfa_serial
 
-        return Profile(stored_profile.name, stored_profile.account_id, role_name, aws_profile)
+        return Profile(stored_profile.name, stored_profile.account_id, role_name, aws_profile,
+                       sts_region, sts_endpoint_url, stored_profile.source_profile,
+                       str(duration_seconds) if duration_seconds is not None else None, mfa_serial)
 
     @staticmethod
     def from_dict(dictionary):
@@ -132,14 +235,64 @@ class Configuration(Dictionable):
         return Configuration(stored_profiles=stored_profiles, **dictionary)
 
 
-def read_config(path: Path) -> Configuration:
+def read_config(path: Path, use_cache: bool = True) -> Configuration:
+    """
+    Read the configuration, from its compiled cache if the file hasn't changed since it was cached
+    """
     if not path.exists():
         raise ConfigurationNotFoundException()
 
+    with span('config.read', cached=use_cache):
+        return _read_config(path, use_cache)
+
+
+def _read_config(path: Path, use_cache: bool) -> Configuration:
+
+    if not use_cache:
+        return _parse_config(path)
+
+    signature = config_signature(path)
+    cache_path = compiled_cache_path(path, 'config')
+
+    try:
+        cached_signature, config = pickle.loads(cache_path.read_bytes())
+
+        if cached_signature == signature:
+            return config
+    except Exception:
+        pass
+
+    config = _parse_config(path)
+    config.reindex_profiles()
+
+    try:
+        write_private_file(cache_path, pickle.dumps((signature, config), protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass
+
+    return config
+
+
+def _parse_config(path: Path) -> Configuration:
     with path.open(mode='r', encoding='utf-8') as readable:
         return Configuration.from_dict(json.load(readable))
 
 
+def config_signature(path: Path) -> Tuple:
+    """
+    Changes whenever the config file or the configuration schema change, to validate the data derived from them
+    """
+    stat = path.stat()
+    schema = tuple(f.name for cls in (Configuration, StoredProfile) for f in dataclasses.fields(cls))
+
+    return __version__, schema, stat.st_mtime_ns, stat.st_size
+
+
+def compiled_cache_path(path: Path, kind: str) -> Path:
+    path_hash = hashlib.sha1(str(path.resolve()).encode('utf-8')).hexdigest()
+    return default_cache_dir_path()/kind/f'{path_hash}.pickle'
+
+
 def write_config(path: Path, config: Configuration):
 
     json_str = json.dumps(config.to_dict(), indent=2, sort_keys=True)
@@ -23,3 +23,41 @@ class ConfigurationNotFoundException(AwsAssumeBaseException):
 
 class ProfileNotConfiguredException(AwsAssumeBaseException):
     pass
+
+
+class RequestDeadlineExceededException(AwsAssumeBaseException):
+    """
+    The request couldn't be completed before its deadline
+    """
+    pass
+
+
+class InvalidRoleChainException(AwsAssumeBaseException):
+    """
+    The source profiles of a profile contain a cycle
+    """
+    pass
+
+
+class AccountSyncConflictException(AwsAssumeBaseException):
+    """
+    Some accounts of the organization don't have a unique profile name with the name template
+    """
+    pass
+
+
+class SinkPathTemplateException(AwsAssumeBaseException):
+    """
+    The path of a file sink doesn't have the {profile} placeholder, but the credentials of several profiles are written
+    """
+    pass
+
+
+class SinkWriteException(AwsAssumeBaseException):
+    """
+    Some sinks couldn't write the credentials, the error of each one is on failures
+    """
+
+    def __init__(self, failures):
+        super().__init__(', '.join(f'{name}: {error.__class__.__name__}: {error}' for name, error in failures.items()))
+        self.failures = failures
@@ -1,31 +1,100 @@
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple
 
 from aws_assume_role.authentication.authorization import Authorizer
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
 from aws_assume_role.authentication.authorization_writer import AuthorizationWriter
 from aws_assume_role.configuration import Configuration, Profile
 from aws_assume_role.exceptions import ProfileNotConfiguredException
+from aws_assume_role.tracing import span, in_current_context
+from aws_assume_role.usage_history import UsageHistory, UsageEntry
 
 
 class ProfileAuthenticationManager:
 
-    def __init__(self, authorizer: Authorizer, writer: AuthorizationWriter, configuration: Configuration):
+    def __init__(self, authorizer: Authorizer, writer: AuthorizationWriter, configuration: Configuration,
+                 snapshot_writer: Optional[AuthorizationWriter] = None, usage_history: Optional[UsageHistory] = None):
         self.authorizer = authorizer
         self.writer = writer
         self.configuration = configuration
+        self.snapshot_writer = snapshot_writer
+        self.usage_history = usage_history
 
-    def init_job(self, profile: str, region: Optional[str]):
+    def init_job(self, profile: str, region: Optional[str], force_refresh: bool = False):
 
-        profile = self._get_profile(profile)
-        details = self.authorizer.request_details(profile)
+        with span('init_job', profile=profile):
+            profile = self._get_profile(profile)
 
-        self.writer.write(details, profile, region)
+            details, use = self._authorize(profile, force_refresh)
 
-    def _get_profile(self, profile: str) -> Profile:
+            if self.usage_history is not None:
+                self._record_usage([use])
 
-        profile = self.configuration.find_profile(profile)
+            self.writer.write(details, profile, region)
+
+            if self.snapshot_writer is not None:
+                self.snapshot_writer.write(details, profile, region)
+
+    def init_jobs(self, profiles: List[str], region: Optional[str], force_refresh: bool = False,
+                  max_workers: int = 8) -> Dict[str, Optional[BaseException]]:
+        """
+        Assume all profiles concurrently and write the obtained credentials at once.
+        Return the error of each profile, or None if it was successful
+        """
+        results: Dict[str, Optional[BaseException]] = {}
+        resolved: List[Profile] = []
+
+        for profile_name in profiles:
+            try:
+                resolved.append(self._get_profile(profile_name))
+            except ProfileNotConfiguredException as e:
+                results[profile_name] = e
+
+        with span('init_jobs', profiles=len(resolved)), ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(p, executor.submit(in_current_context(self._authorize), p, force_refresh)) for p in resolved]
+
+        authorized = []
+        uses = []
+
+        for profile, future in futures:
+            error = future.exception()
+            results[profile.name] = error
+
+            if error is None:
+                details, use = future.result()
+                authorized.append((details, profile))
+                uses.append(use)
+
+        if self.usage_history is not None and len(uses) > 0:
+            self._record_usage(uses)
+
+        # Always called, so a writer can apply its own changes (like pruning) even if nothing was assumed
+        self.writer.write_batch(authorized, region)
+
+        if self.snapshot_writer is not None and len(authorized) > 0:
+            self.snapshot_writer.write_batch(authorized, region)
+
+        return {name: results[name] for name in profiles}
+
+    def _authorize(self, profile: Profile, force_refresh: bool) -> Tuple[AuthorizationDetails, UsageEntry]:
+        started_at = time.perf_counter()
+        details, cached = self.authorizer.authorize(profile, force_refresh)
+
+        return details, UsageEntry(profile.name, time.time(), time.perf_counter() - started_at, cached)
+
+    def _record_usage(self, uses: List[UsageEntry]):
+        # The usage history only feeds --prefetch and --stats, it never fails the assume
+        try:
+            self.usage_history.record_batch(uses)
+        except OSError:
+            pass
+
+    def _get_profile(self, profile_name: str) -> Profile:
+
+        profile = self.configuration.find_profile(profile_name)
 
         if profile is None:
-            raise ProfileNotConfiguredException(f"For profile {profile}")
+            raise ProfileNotConfiguredException(f"For profile {profile_name}")
 
         return profile
-
@@ -0,0 +1,123 @@
+import pickle
+import re
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from aws_assume_role import configuration
+from aws_assume_role.configuration import Configuration
+from aws_assume_role.tracing import span
+from aws_assume_role.utils.file_utils import write_private_file
+
+
+class IndexedProfile(NamedTuple):
+    name: str
+    account_id: str
+    role_name: str
+    aws_profile: str
+    source_profile: Optional[str]
+
+
+class ProfileIndex:
+    """
+    Resolved fields of every stored profile, searchable by name prefix, fuzzy name, account id, role name and aws
+    profile without loading the configuration. The rows are plain tuples, which are unpickled several times faster
+    than the named ones. The aws profile is None on the rows without their own one: the default depends on the
+    environment, so it's resolved on each query instead of when the index is built
+    """
+
+    def __init__(self, rows: List[Tuple], aws_landing_profile: Optional[str] = None):
+        self.rows = rows
+        self.aws_landing_profile = aws_landing_profile
+        self._names = [row[0].lower() for row in rows]
+
+    @property
+    def profiles(self) -> List[IndexedProfile]:
+        default = configuration.default_aws_profile(self.aws_landing_profile)
+        return [self._resolve(row, default) for row in self.rows]
+
+    @staticmethod
+    def from_configuration(config: Configuration):
+        rows = []
+
+        for stored in config.stored_profiles:
+            profile = config.find_profile(stored.name)
+            rows.append((profile.name, profile.account_id, profile.role_name, stored.aws_profile,
+                         profile.source_profile))
+
+        return ProfileIndex(rows, config.aws_landing_profile)
+
+    def search(self, prefix: Optional[str] = None, query: Optional[str] = None, account_id: Optional[str] = None,
+               role_name: Optional[str] = None, aws_profile: Optional[str] = None) -> List[IndexedProfile]:
+        """
+        Profiles matching all the given filters. With a fuzzy query, the characters must appear in order on the name
+        and the results are ranked by prefix, substring and then the shortest match
+        """
+        prefix = prefix.lower() if prefix is not None else None
+        query = query.lower() if query is not None else None
+        pattern = re.compile('.*?'.join(map(re.escape, query))) if query else None
+        default = configuration.default_aws_profile(self.aws_landing_profile)
+
+        ranked = []
+
+        for position, (row, name) in enumerate(zip(self.rows, self._names)):
+            if prefix is not None and not name.startswith(prefix):
+                continue
+
+            if account_id is not None and row[1] != account_id:
+                continue
+
+            if role_name is not None and row[2] != role_name:
+                continue
+
+            if aws_profile is not None and (row[3] or default) != aws_profile:
+                continue
+
+            if pattern is None:
+                ranked.append(((position,), row))
+                continue
+
+            match = pattern.search(name)
+
+            if match is None:
+                continue
+
+            kind = 0 if name.startswith(query) else 1 if query in name else 2
+            ranked.append(((kind, match.end() - match.start(), len(name), position), row))
+
+        if pattern is not None:
+            ranked.sort(key=lambda item: item[0])
+
+        return [self._resolve(row, default) for _, row in ranked]
+
+    @staticmethod
+    def _resolve(row: Tuple, default_aws_profile: Optional[str]) -> IndexedProfile:
+        name, account_id, role_name, aws_profile, source_profile = row
+        return IndexedProfile(name, account_id, role_name, aws_profile or default_aws_profile, source_profile)
+
+
+def load_profile_index(config_path: Path) -> ProfileIndex:
+    """
+    Read the persisted index of the config file, rebuilding it only when the config file has changed
+    """
+    signature = configuration.config_signature(config_path)
+    index_path = configuration.compiled_cache_path(config_path, 'index')
+
+    with span('index.read'):
+        try:
+            cached_signature, rows, aws_landing_profile = pickle.loads(index_path.read_bytes())
+
+            if cached_signature == signature:
+                return ProfileIndex(rows, aws_landing_profile)
+        except Exception:
+            pass
+
+    with span('index.build'):
+        index = ProfileIndex.from_configuration(configuration.read_config(config_path))
+
+    try:
+        content = (signature, index.rows, index.aws_landing_profile)
+        write_private_file(index_path, pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass
+
+    return index
@@ -0,0 +1,113 @@
+import getpass
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union, TYPE_CHECKING
+
+from aws_assume_role import configuration
+from aws_assume_role.authentication import Authorizer
+from aws_assume_role.authentication.authorization_cache import AuthorizationCache
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.aws.identity_cache import IdentityCache
+from aws_assume_role.aws.mfa_session import MfaSessionProvider, MfaSessionCache
+from aws_assume_role.aws.scheduler import StsRequestScheduler
+from aws_assume_role.aws.session_duration import SessionDurationCache
+from aws_assume_role.aws.sts import StsClient
+from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.exceptions import ProfileNotConfiguredException
+
+if TYPE_CHECKING:
+    import boto3
+
+CREDENTIALS_METHOD = 'aws-assume-role'
+
+_authorizers: Dict[Path, Authorizer] = {}
+_authorizers_lock = threading.Lock()
+
+
+def default_mfa_token_provider(mfa_serial: str) -> str:
+    return getpass.getpass(f'MFA code of {mfa_serial}: ')
+
+
+def shared_authorizer(config_path: Path, config: Configuration,
+                      mfa_token_provider: Callable[[str], str] = default_mfa_token_provider) -> Authorizer:
+    """
+    Process-wide authorizer of the config file, so all the sessions share its STS scheduler, caches and boto clients
+    """
+    with _authorizers_lock:
+        if config_path not in _authorizers:
+            identity_cache = IdentityCache.from_configuration(config)
+            session_duration_cache = SessionDurationCache.from_configuration(config)
+            mfa_session_provider = MfaSessionProvider(mfa_token_provider, config.mfa_session_duration,
+                                                      MfaSessionCache.from_configuration(config))
+
+            sts_client = StsClient.from_default_factory(config, identity_cache, False, session_duration_cache,
+                                                        mfa_session_provider,
+                                                        StsRequestScheduler.from_configuration(config))
+            cache = AuthorizationCache.from_configuration(config)
+
+            _authorizers[config_path] = Authorizer(sts_client, config, None, cache)
+
+        return _authorizers[config_path]
+
+
+def _credentials_metadata(details: AuthorizationDetails) -> Dict[str, Optional[str]]:
+    return {
+        'access_key': details.access_key,
+        'secret_key': details.secret_key,
+        'token': details.session_token,
+        'expiry_time': details.expiration.isoformat() if details.expiration is not None else None,
+    }
+
+
+def refreshable_credentials(authorizer: Authorizer, profile: Profile):
+    """
+    botocore credentials of the profile, assumed again by the first call which needs them close to their expiration.
+    The other threads keep using the current credentials while they're refreshed
+    """
+    from botocore.credentials import RefreshableCredentials
+
+    # The first credentials can come from the local cache, the refreshes always assume the role again, because the
+    # cached ones would be as close to the expiration as the current ones
+    return RefreshableCredentials.create_from_metadata(
+        _credentials_metadata(authorizer.request_details(profile)),
+        lambda: _credentials_metadata(authorizer.request_details(profile, force_refresh=True)),
+        CREDENTIALS_METHOD,
+    )
+
+
+class _CredentialProvider:
+    """
+    botocore credential provider which always returns the given credentials
+    """
+    METHOD = CREDENTIALS_METHOD
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+
+    def load(self):
+        return self.credentials
+
+
+def create_session(profile_name: str, config_path: Union[str, Path, None] = None,
+                   region_name: Optional[str] = None,
+                   mfa_token_provider: Callable[[str], str] = default_mfa_token_provider) -> 'boto3.Session':
+    """
+    boto3 session of the profile, whose credentials are refreshed in-process before they expire
+    """
+    import boto3
+    import botocore.session
+    from botocore.credentials import CredentialResolver
+
+    config_path = Path(config_path or configuration.default_config_file_path()).expanduser().resolve()
+    config = configuration.read_config(config_path)
+    profile = config.find_profile(profile_name)
+
+    if profile is None:
+        raise ProfileNotConfiguredException(f"For profile {profile_name}")
+
+    credentials = refreshable_credentials(shared_authorizer(config_path, config, mfa_token_provider), profile)
+
+    botocore_session = botocore.session.Session()
+    botocore_session.register_component('credential_provider', CredentialResolver([_CredentialProvider(credentials)]))
+
+    return boto3.Session(botocore_session=botocore_session, region_name=region_name or config.aws_default_region)
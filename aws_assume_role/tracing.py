@@ -0,0 +1,127 @@
+import abc
+import contextvars
+import json
+import threading
+import time
+from abc import ABCMeta
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, ContextManager, Callable
+
+
+class Tracer(metaclass=ABCMeta):
+    """
+    Library hook to measure the phases of the program: set_tracer(MyTracer())
+    """
+
+    @abc.abstractmethod
+    def span(self, name: str, **attributes) -> ContextManager:
+        pass
+
+
+class _NoopSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+_tracer: Optional[Tracer] = None
+# Depth of the current span, carried by the context instead of the thread so the pool workers keep their parent's one
+_span_depth: contextvars.ContextVar[int] = contextvars.ContextVar('span_depth', default=0)
+
+
+def set_tracer(tracer: Optional[Tracer]):
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, **attributes) -> ContextManager:
+    """
+    Measure the block with the current tracer. Without tracer it returns a shared no-op context
+    """
+    if _tracer is None:
+        return _NOOP_SPAN
+
+    return _tracer.span(name, **attributes)
+
+
+def in_current_context(function: Callable) -> Callable:
+    """
+    Wrap the function to run, on any thread, within a copy of the current context, so the spans of the pool workers
+    are nested under the span which submitted them
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(function, *args, **kwargs)
+
+
+@dataclass
+class RecordedSpan:
+    name: str
+    start: float
+    duration: float = 0.0
+    depth: int = 0
+    thread: str = ''
+    attributes: Dict = field(default_factory=dict)
+
+
+class RecordingTracer(Tracer):
+    """
+    Keep all the spans in memory, to print a timing breakdown or dump them as JSON
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[RecordedSpan] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes) -> ContextManager:
+        return _RecordingSpan(self, name, attributes)
+
+    def summary(self) -> str:
+        lines = [f'{"start":>9} {"duration":>9}  span']
+
+        for s in sorted(self.spans, key=lambda s: s.start):
+            attributes = ' '.join(f'{k}={v}' for k, v in s.attributes.items())
+            lines.append(f'{s.start * 1000:8.1f}ms {s.duration * 1000:8.1f}ms  {"  " * s.depth}{s.name} {attributes}')
+
+        return '\n'.join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps([s.__dict__ for s in sorted(self.spans, key=lambda s: s.start)], default=str, indent=2)
+
+    def _record(self, recorded: RecordedSpan):
+        with self._lock:
+            self.spans.append(recorded)
+
+
+class _RecordingSpan:
+
+    def __init__(self, tracer: RecordingTracer, name: str, attributes: Dict):
+        self.tracer = tracer
+        self.recorded = RecordedSpan(name, 0.0, attributes=attributes)
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self):
+        self.recorded.depth = _span_depth.get()
+        self._token = _span_depth.set(self.recorded.depth + 1)
+
+        self.recorded.thread = threading.current_thread().name
+        self.recorded.start = time.perf_counter() - self.tracer.origin
+        return self
+
+    def __exit__(self, exc_type, *_):
+        self.recorded.duration = time.perf_counter() - self.tracer.origin - self.recorded.start
+        _span_depth.reset(self._token)
+
+        if exc_type is not None:
+            self.recorded.attributes['error'] = exc_type.__name__
+
+        self.tracer._record(self.recorded)
+        return False
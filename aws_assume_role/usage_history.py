@@ -0,0 +1,126 @@
+import math
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Dict, Tuple
+
+from aws_assume_role.configuration import Configuration
+from aws_assume_role.utils.file_utils import locked_file
+
+SOURCES = ('sts', 'cache')
+
+
+@dataclass
+class UsageEntry:
+    profile: str
+    timestamp: float
+    latency: float
+    cached: bool = False
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of the values, which can't be empty
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class UsageHistory:
+    """
+    Append-only log of the assumed profiles, one ``<timestamp> <latency> <source> <profile>`` line per use, where the
+    source is ``sts`` or ``cache``. When the log reaches max_bytes it's rotated to ``<name>.1``, so the history keeps
+    between one and two logs of the most recent uses
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def from_configuration(configuration: Configuration):
+        return UsageHistory(configuration.cache_dir_path/'usage.log', configuration.usage_history_max_bytes)
+
+    @property
+    def rotated_path(self) -> Path:
+        return self.path.with_name(f'{self.path.name}.1')
+
+    def record(self, profile: str, latency: float, timestamp: Optional[float] = None, cached: bool = False):
+        self.record_batch([UsageEntry(profile, timestamp or time.time(), latency, cached)])
+
+    def record_batch(self, entries: List[UsageEntry]):
+        """
+        Append the uses with a single lock of the log
+        """
+        lines = ''.join(f'{e.timestamp:.0f} {e.latency:.4f} {"cache" if e.cached else "sts"} {e.profile}\n'
+                        for e in entries)
+
+        with locked_file(self.path):
+            if self.path.exists() and self.path.stat().st_size + len(lines) > self.max_bytes:
+                os.replace(self.path, self.rotated_path)
+
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+            with os.fdopen(fd, mode='a', encoding='utf-8') as writable:
+                writable.write(lines)
+
+    def entries(self) -> List[UsageEntry]:
+        entries = []
+
+        for path in (self.rotated_path, self.path):
+            try:
+                lines = path.read_text(encoding='utf-8').splitlines()
+            except OSError:
+                continue
+
+            for line in lines:
+                try:
+                    timestamp, latency, profile = line.split(' ', 2)
+                    source, _, name = profile.partition(' ')
+
+                    # The lines without source come from the previous format, which only recorded single assumes
+                    if source in SOURCES and name != '':
+                        entries.append(UsageEntry(name, float(timestamp), float(latency), source == 'cache'))
+                    else:
+                        entries.append(UsageEntry(profile, float(timestamp), float(latency)))
+                except ValueError:
+                    continue
+
+        return entries
+
+    def rank(self, now: Optional[float] = None, half_life: float = 3 * 86400) -> List[Tuple[str, float]]:
+        """
+        Profiles by frecency: each use scores 1, halved each half_life seconds since it happened
+        """
+        now = now or time.time()
+        scores: Dict[str, float] = {}
+
+        for entry in self.entries():
+            age = max(0.0, now - entry.timestamp)
+            scores[entry.profile] = scores.get(entry.profile, 0.0) + 0.5 ** (age / half_life)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def latency_stats(self) -> Dict[str, Tuple[int, int, Optional[float], Optional[float]]]:
+        """
+        (uses, cache hits, p50, p95) of each profile, where the percentiles are the latency (seconds) of the uses which
+        reached STS, or None if all of them were served by the cache
+        """
+        uses: Dict[str, List[UsageEntry]] = {}
+
+        for entry in self.entries():
+            uses.setdefault(entry.profile, []).append(entry)
+
+        stats = {}
+
+        for name, entries in sorted(uses.items()):
+            latencies = [e.latency for e in entries if not e.cached]
+            hits = len(entries) - len(latencies)
+
+            if len(latencies) == 0:
+                stats[name] = (len(entries), hits, None, None)
+            else:
+                stats[name] = (len(entries), hits, percentile(latencies, 0.5), percentile(latencies, 0.95))
+
+        return stats
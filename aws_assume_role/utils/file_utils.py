@@ -0,0 +1,79 @@
+import contextlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Dict, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows hasn't advisory locks
+    fcntl = None
+
+
+def atomic_write_file(path: Path, content: Union[str, bytes], mode: int = 0o600):
+    """
+    Replace the file content through a synced temporary file, so the readers never see a half-written file
+    """
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+
+    try:
+        os.fchmod(fd, mode)
+
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        with os.fdopen(fd, mode='wb') as writable:
+            writable.write(content)
+            writable.flush()
+            os.fsync(writable.fileno())
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_private_file(path: Path, content: Union[str, bytes]):
+    """
+    Atomically replace the file content, only readable by the owner (0600)
+    """
+    atomic_write_file(path, content, 0o600)
+
+
+@contextlib.contextmanager
+def locked_file(path: Path):
+    """
+    Hold an exclusive advisory lock over the file during the context, through a sibling ``.lock`` file
+    """
+    if fcntl is None:
+        yield
+        return
+
+    lock_path = path.with_name(f'{path.name}.lock')
+    lock_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    with lock_path.open(mode='a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def read_json_file(path: Path) -> Optional[Dict]:
+    """
+    Return the parsed content or None if the file is missing or corrupted
+    """
+    try:
+        with path.open(mode='r', encoding='utf-8') as readable:
+            return json.load(readable)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_file(path: Path, content: Dict):
+    write_private_file(path, json.dumps(content, sort_keys=True))
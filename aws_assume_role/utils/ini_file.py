@@ -0,0 +1,166 @@
+import contextlib
+import re
+import stat
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Iterator
+
+from aws_assume_role.utils.file_utils import locked_file, atomic_write_file
+
+SECTION_PATTERN = re.compile(r'^\s*\[(?P<name>[^]]+)]')
+OPTION_PATTERN = re.compile(r'^(?P<key>[^=:\s#;][^=:]*?)\s*[=:]\s*(?P<value>.*?)\s*$')
+
+
+class IniSection:
+
+    def __init__(self, name: str, lines: List[str]):
+        self.name = name
+        self.lines = lines
+        self.removed = False
+
+    def options(self):
+        """
+        Yield (key, value, (first line, last line + 1)) of each option, continuation lines included. The keys are
+        lower-cased, as botocore reads them
+        """
+        index = 1
+
+        while index < len(self.lines):
+            match = OPTION_PATTERN.match(self.lines[index])
+            index += 1
+
+            if match is None:
+                continue
+
+            option_start = index - 1
+
+            while index < len(self.lines) and self.lines[index][:1] in (' ', '\t') and self.lines[index].strip() != '':
+                index += 1
+
+            yield match.group('key').strip().lower(), match.group('value'), (option_start, index)
+
+
+class IniDocument:
+    """
+    Ini document which keeps the original lines, comments included, of every section not updated. The sections are
+    indexed once on parse, so each operation only reads the lines of its own section
+    """
+
+    def __init__(self, lines: List[str]):
+        self.preamble: List[str] = []
+        self._sections: List[IniSection] = []
+        self._index: Dict[str, List[IniSection]] = {}
+
+        current = self.preamble
+
+        for line in lines:
+            match = SECTION_PATTERN.match(line)
+
+            if match is not None:
+                current = self._append_section(match.group('name').strip(), [line]).lines
+            else:
+                current.append(line)
+
+    @staticmethod
+    def parse(text: str):
+        lines = text.splitlines(keepends=True)
+
+        if len(lines) > 0 and not lines[-1].endswith('\n'):
+            lines[-1] += '\n'
+
+        return IniDocument(lines)
+
+    def sections(self) -> List[str]:
+        return [section.name for section in self._sections if not section.removed]
+
+    def __contains__(self, section: str) -> bool:
+        return self._find_section(section) is not None
+
+    def get(self, section: str) -> Optional[Dict[str, str]]:
+        found = self._find_section(section)
+
+        if found is None:
+            return None
+
+        return {key: value for key, value, _ in found.options()}
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """
+        (name, options) of every section, in order
+        """
+        for section in self._sections:
+            if not section.removed:
+                yield section.name, {key: value for key, value, _ in section.options()}
+
+    def update(self, section: str, values: Dict[str, str]):
+        """
+        Set the values of the section, creating it at the end of the document if not exists
+        """
+        found = self._find_section(section)
+
+        if found is None:
+            last_lines = self._last_lines()
+
+            if len(last_lines) > 0 and last_lines[-1].strip() != '':
+                last_lines.append('\n')
+
+            self._append_section(section, [f'[{section}]\n', *(f'{k} = {v}\n' for k, v in values.items()), '\n'])
+            return
+
+        pending = {key.strip().lower(): (key, value) for key, value in values.items()}
+
+        # Replace from the bottom, so the line indexes of the previous options are still valid
+        for key, _, (option_start, option_end) in reversed(list(found.options())):
+            if key in pending:
+                found.lines[option_start:option_end] = ['{} = {}\n'.format(*pending.pop(key))]
+
+        if len(pending) > 0:
+            end = len(found.lines)
+
+            while end > 1 and found.lines[end - 1].strip() == '':
+                end -= 1
+
+            found.lines[end:end] = [f'{k} = {v}\n' for k, v in pending.values()]
+
+    def remove(self, section: str):
+        found = self._find_section(section)
+
+        if found is not None:
+            found.removed = True
+            self._index[section].pop(0)
+
+    def __str__(self):
+        return ''.join(self.preamble) + ''.join(''.join(s.lines) for s in self._sections if not s.removed)
+
+    def _find_section(self, section: str) -> Optional[IniSection]:
+        found = self._index.get(section)
+        return found[0] if found else None
+
+    def _append_section(self, name: str, lines: List[str]) -> IniSection:
+        section = IniSection(name, lines)
+
+        self._sections.append(section)
+        self._index.setdefault(name, []).append(section)
+
+        return section
+
+    def _last_lines(self) -> List[str]:
+        return next((s.lines for s in reversed(self._sections) if not s.removed), self.preamble)
+
+
+@contextlib.contextmanager
+def edit_ini_file(path: Path):
+    """
+    Locked read-modify-write of the ini file, atomically replaced at the end of the context if it has changed
+    """
+    path = path.expanduser().resolve()
+
+    with locked_file(path):
+        content = path.read_text(encoding='utf-8') if path.exists() else ''
+        document = IniDocument.parse(content)
+        original = str(document)
+
+        yield document
+
+        if str(document) != original:
+            mode = stat.S_IMODE(path.stat().st_mode) if path.exists() else 0o600
+            atomic_write_file(path, str(document), mode)
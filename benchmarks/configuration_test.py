@@ -0,0 +1,41 @@
+import json
+
+from aws_assume_role import configuration
+from aws_assume_role.configuration import Configuration
+from aws_assume_role.profile_index import load_profile_index, ProfileIndex
+from benchmarks.conftest import build_config
+
+
+def test_read_config(benchmark, config_path):
+    benchmark(configuration.read_config, config_path, False)
+
+
+def test_read_compiled_config(benchmark, config_path):
+    configuration.read_config(config_path)
+
+    benchmark(configuration.read_config, config_path)
+
+
+def test_configuration_from_dict(benchmark, config_path):
+    content = config_path.read_text()
+
+    benchmark(lambda: Configuration.from_dict(json.loads(content)))
+
+
+def test_find_profile(benchmark):
+    config = build_config(10_000)
+    config.find_profile('profile-0')
+
+    benchmark(config.find_profile, 'profile-9999')
+
+
+def test_load_profile_index(benchmark, config_path):
+    load_profile_index(config_path)
+
+    benchmark(load_profile_index, config_path)
+
+
+def test_fuzzy_search(benchmark):
+    index = ProfileIndex.from_configuration(build_config(10_000))
+
+    benchmark(index.search, None, 'pf99')
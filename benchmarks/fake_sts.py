@@ -0,0 +1,208 @@
+"""
+Local stand-in of STS (query protocol) answering GetCallerIdentity, AssumeRole and GetSessionToken, with configurable
+latency, throttling and error injection. Run it standalone with ``python -m benchmarks.fake_sts --port 8900`` and
+point the program to it with ``ASSUME_AWS_STS_ENDPOINT_URL=http://127.0.0.1:8900``
+"""
+import argparse
+import random
+import re
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs
+
+from aws_assume_role.aws.scheduler import TokenBucket
+
+NAMESPACE = 'https://sts.amazonaws.com/doc/2011-06-15/'
+
+
+def parse_seconds(value: str) -> float:
+    match = re.fullmatch(r'([\d.]+)(ms|s)?', value)
+
+    if match is None:
+        raise ValueError(f'Invalid duration {value}, like 50ms or 0.05s')
+
+    return float(match.group(1)) / (1000 if match.group(2) == 'ms' else 1)
+
+
+def latency_distribution(spec: str) -> Callable[[], float]:
+    """
+    Sampler of a latency spec: ``50ms`` (fixed), ``uniform:20ms:80ms`` or ``lognormal:<median>:<sigma>``
+    """
+    kind, *args = spec.split(':')
+
+    if kind == 'uniform':
+        low, high = map(parse_seconds, args)
+        return lambda: random.uniform(low, high)
+
+    if kind == 'lognormal':
+        median, sigma = parse_seconds(args[0]), float(args[1])
+        return lambda: median * random.lognormvariate(0, sigma)
+
+    fixed = parse_seconds(spec)
+    return lambda: fixed
+
+
+@dataclass
+class FakeStsBehaviour:
+    latency: Callable[[], float] = lambda: 0.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: Optional[float] = None
+    account_id: str = '000000000000'
+    max_session_duration: int = 43200
+
+
+@dataclass
+class FakeStsStats:
+    requests: Dict[str, int] = field(default_factory=dict)
+    throttled: int = 0
+    errors: int = 0
+
+    def summary(self) -> str:
+        actions = ', '.join(f'{k}={v}' for k, v in sorted(self.requests.items()))
+        return f'fake STS: {actions} ({self.throttled} throttled, {self.errors} errors)'
+
+
+class FakeStsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, behaviour: FakeStsBehaviour, port: int = 0):
+        super().__init__(('127.0.0.1', port), FakeStsRequestHandler)
+        self.behaviour = behaviour
+        self.stats = FakeStsStats()
+        self.bucket = TokenBucket(behaviour.rate_limit, behaviour.rate_limit) if behaviour.rate_limit else None
+        self.lock = threading.Lock()
+
+    @property
+    def endpoint_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name='fake-sts', daemon=True)
+        thread.start()
+        return thread
+
+    def record(self, action: str, throttled: bool = False, error: bool = False):
+        with self.lock:
+            self.stats.requests[action] = self.stats.requests.get(action, 0) + 1
+            self.stats.throttled += int(throttled)
+            self.stats.errors += int(error)
+
+
+class FakeStsRequestHandler(BaseHTTPRequestHandler):
+    server: FakeStsServer
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        params = {k: v[0] for k, v in parse_qs(body).items()}
+        action = params.get('Action', '')
+        behaviour = self.server.behaviour
+
+        time.sleep(max(0.0, behaviour.latency()))
+
+        throttled = random.random() < behaviour.throttle_rate or \
+            (self.server.bucket is not None and not self.server.bucket.acquire(time.monotonic()))
+
+        if throttled:
+            self.server.record(action, throttled=True)
+            return self._error(400, 'Throttling', 'Rate exceeded')
+
+        if random.random() < behaviour.error_rate:
+            self.server.record(action, error=True)
+            return self._error(500, 'InternalFailure', 'Injected failure', 'Receiver')
+
+        self.server.record(action)
+
+        if action == 'GetCallerIdentity':
+            return self._result(action, f'<Arn>arn:aws:iam::{behaviour.account_id}:user/load</Arn>'
+                                        f'<UserId>AIDALOAD</UserId><Account>{behaviour.account_id}</Account>')
+
+        if action not in ('AssumeRole', 'GetSessionToken'):
+            return self._error(400, 'InvalidAction', f'Could not find operation {action}')
+
+        duration = int(params.get('DurationSeconds', 3600))
+
+        if duration > behaviour.max_session_duration:
+            return self._error(400, 'ValidationError', 'The requested DurationSeconds exceeds the MaxSessionDuration '
+                                                       'set for this role.')
+
+        result = self._credentials(duration)
+
+        if action == 'AssumeRole':
+            role_arn = params.get('RoleArn', '')
+            result += (f'<AssumedRoleUser><AssumedRoleId>AROALOAD:{params.get("RoleSessionName", "")}'
+                       f'</AssumedRoleId><Arn>{role_arn}</Arn></AssumedRoleUser>')
+
+        self._result(action, result)
+
+    def log_message(self, format, *args):
+        pass
+
+    @staticmethod
+    def _credentials(duration: int) -> str:
+        expiration = (datetime.now(timezone.utc) + timedelta(seconds=duration)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        return (f'<Credentials><AccessKeyId>ASIA{secrets.token_hex(8).upper()}</AccessKeyId>'
+                f'<SecretAccessKey>{secrets.token_urlsafe(30)}</SecretAccessKey>'
+                f'<SessionToken>{secrets.token_urlsafe(64)}</SessionToken>'
+                f'<Expiration>{expiration}</Expiration></Credentials>')
+
+    def _result(self, action: str, result: str):
+        self._send(200, f'<{action}Response xmlns="{NAMESPACE}"><{action}Result>{result}</{action}Result>'
+                        f'<ResponseMetadata><RequestId>{secrets.token_hex(16)}</RequestId></ResponseMetadata>'
+                        f'</{action}Response>')
+
+    def _error(self, status: int, code: str, message: str, error_type: str = 'Sender'):
+        self._send(status, f'<ErrorResponse xmlns="{NAMESPACE}"><Error><Type>{error_type}</Type><Code>{code}</Code>'
+                           f'<Message>{message}</Message></Error><RequestId>{secrets.token_hex(16)}</RequestId>'
+                           f'</ErrorResponse>')
+
+    def _send(self, status: int, content: str):
+        body = content.encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def add_behaviour_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--latency', default='0ms',
+                        help='Latency of each response: 50ms, uniform:20ms:80ms or lognormal:<median>:<sigma>')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of throttled requests')
+    parser.add_argument('--rate-limit', type=float, help='Requests per second accepted, the rest are throttled')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failed with a 500')
+    parser.add_argument('--max-session-duration', type=int, default=43200,
+                        help='MaxSessionDuration of every role (default: 43200)')
+
+
+def behaviour_from_arguments(args: argparse.Namespace) -> FakeStsBehaviour:
+    return FakeStsBehaviour(latency_distribution(args.latency), args.throttle_rate, args.error_rate,
+                            args.rate_limit, max_session_duration=args.max_session_duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in of STS')
+    parser.add_argument('--port', type=int, default=8900)
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeStsServer(behaviour_from_arguments(args), args.port)
+    print(f'Serving fake STS on {server.endpoint_url}')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(server.stats.summary())
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
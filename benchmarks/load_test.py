@@ -0,0 +1,57 @@
+import pytest
+
+import aws_assume_role
+from aws_assume_role import configuration
+from aws_assume_role.aws.session_duration import SessionDurationCache
+from aws_assume_role.aws.sts import StsClient
+from aws_assume_role.configuration import Profile, Configuration, StoredProfile
+from benchmarks.fake_sts import FakeStsServer, FakeStsBehaviour, latency_distribution
+from benchmarks.load import run_load
+
+pytest.importorskip('botocore')
+
+
+@pytest.fixture
+def fake_sts():
+    server = FakeStsServer(FakeStsBehaviour(latency_distribution('uniform:1ms:5ms'), throttle_rate=0.1,
+                                            max_session_duration=14400))
+    server.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_assumes_survive_throttling(fake_sts, tmp_path):
+    result = run_load(fake_sts, 50, 8, 2, 1000, tmp_path)
+
+    assert result['assumes'] == 100 and sum(result['failures'].values()) == 0
+    assert fake_sts.stats.requests['AssumeRole'] >= 100
+
+    # botocore doesn't retry, so the scheduler sees every throttled request and every real request
+    assert result['scheduler'].throttles == fake_sts.stats.throttled > 0
+    assert result['scheduler'].requests == sum(fake_sts.stats.requests.values())
+
+
+def test_auto_session_duration_against_fake_sts(fake_sts, tmp_path):
+    config = Configuration('role', '000000000000', aws_landing_profile=None, sts_endpoint_url=fake_sts.endpoint_url)
+    sts_client = StsClient.from_default_factory(config, session_duration_cache=SessionDurationCache(tmp_path/'d', 60))
+
+    fake_sts.behaviour.throttle_rate = 0
+    sts_client.assume(Profile('dev', '111111111111', 'role', None, sts_endpoint_url=fake_sts.endpoint_url,
+                              duration_seconds='auto'))
+
+    assert sts_client.session_duration_cache.get('arn:aws:iam::111111111111:role/role') == 14400
+
+
+def test_library_session_against_fake_sts(fake_sts, tmp_path):
+    config = Configuration('role', '000000000000', aws_landing_profile=None, sts_endpoint_url=fake_sts.endpoint_url,
+                           stored_profiles=[StoredProfile('dev', '111111111111')])
+    configuration.write_config(tmp_path/'config.json', config)
+
+    fake_sts.behaviour.throttle_rate = 0
+    session = aws_assume_role.session('dev', tmp_path/'config.json')
+
+    assert session.get_credentials().get_frozen_credentials().access_key.startswith('ASIA')
+    assert session.client('sts', endpoint_url=fake_sts.endpoint_url).get_caller_identity()['Account'] == '000000000000'
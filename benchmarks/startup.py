@@ -0,0 +1,87 @@
+"""
+Startup time check of two builds of the program, like the full and the slim PyInstaller builds. Each scenario runs
+offline, the assume one against the local fake STS ::
+
+    python -m benchmarks.startup ./dist/linux/aws-assume-role/aws-assume-role \\
+        ./dist/slim/aws-assume-role/aws-assume-role
+
+It fails when the median of a scenario of the second build is slower than the first one by more than --max-ratio
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from aws_assume_role import configuration
+from benchmarks.conftest import build_config
+from benchmarks.fake_sts import FakeStsServer, FakeStsBehaviour
+from benchmarks.load import isolate_environment
+
+
+def scenarios(config_path: Path) -> dict:
+    return {
+        'help': ['--help'],
+        'list': ['--list', '--config-path', str(config_path)],
+        'assume': ['--process', '--no-cache', 'profile-0', '--config-path', str(config_path)],
+    }
+
+
+def measure(command: List[str], runs: int) -> float:
+    # The first run warms the disk cache, it isn't measured
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    durations = []
+
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - started_at)
+
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the startup time of two builds')
+    parser.add_argument('baseline', help='Executable of the reference build')
+    parser.add_argument('candidate', help='Executable of the compared build')
+    parser.add_argument('--runs', type=int, default=10, help='Runs of each scenario (default: 10)')
+    parser.add_argument('--max-ratio', type=float, default=1.05,
+                        help='Maximum candidate/baseline ratio of the medians (default: 1.05)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        isolate_environment(Path(directory))
+
+        server = FakeStsServer(FakeStsBehaviour())
+        server.start()
+
+        config = build_config(1_000)
+        config.aws_landing_profile = None
+        config.sts_endpoint_url = server.endpoint_url
+        config_path = Path(directory)/'config.json'
+        configuration.write_config(config_path, config)
+
+        failed = False
+        print(f'{"scenario":<10} {"baseline":>10} {"candidate":>10} {"ratio":>6}')
+
+        try:
+            for name, arguments in scenarios(config_path).items():
+                baseline = measure([args.baseline, *arguments], args.runs)
+                candidate = measure([args.candidate, *arguments], args.runs)
+
+                ratio = candidate / baseline
+                failed = failed or ratio > args.max_ratio
+
+                print(f'{name:<10} {baseline * 1000:>8.1f}ms {candidate * 1000:>8.1f}ms {ratio:>6.2f}')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""
+Slim onedir build: only the botocore/boto3 data of the services used by the program, and without the unused stdlib
+packages. Build it with ``make build_slim``
+
+There is no pre-warmed botocore loader: the cached commands (--list, --process) don't import the SDK at all, and the
+other ones only load the few models kept here, so the bundled bytecode is the whole startup path
+"""
+import os
+from pathlib import PurePosixPath
+
+ROOT = os.path.abspath(os.path.join(SPECPATH, '..'))
+
+# Service models reached by the program, the top level files (endpoints, partitions, retries...) are always kept
+SERVICES = {'sts', 'organizations', 'iam'}
+
+EXCLUDES = ['tkinter', 'test', 'lib2to3', 'pydoc_data', 'benchmarks']
+
+
+def is_used_data(dest_name):
+    parts = PurePosixPath(dest_name.replace(os.sep, '/')).parts
+
+    if parts[:1] not in (('botocore',), ('boto3',)) or len(parts) < 2 or parts[1] != 'data':
+        return True
+
+    return len(parts) == 3 or parts[2] in SERVICES
+
+
+a = Analysis(
+    [os.path.join(ROOT, 'aws_assume_role', 'cli', 'main.py')],
+    pathex=[ROOT],
+    excludes=EXCLUDES,
+    noarchive=False,
+)
+
+a.datas = [entry for entry in a.datas if is_used_data(entry[0])]
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='aws-assume-role',
+    strip=True,
+    upx=False,
+    console=True,
+)
+
+coll = COLLECT(exe, a.binaries, a.datas, strip=True, upx=False, name='aws-assume-role')
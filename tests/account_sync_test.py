@@ -0,0 +1,81 @@
+from aws_assume_role.account_sync import plan_account_sync, apply_account_sync
+from aws_assume_role.aws.organizations import OrganizationsClient
+from aws_assume_role.configuration import Configuration, StoredProfile
+
+
+class FakePaginator:
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def paginate(self, **kwargs):
+        return self.pages(**kwargs)
+
+
+class FakeOrganizations:
+    """
+    Organization with the root OU r-1 holding ou-1, and 1000 accounts split in pages of 20
+    """
+
+    def __init__(self):
+        self.accounts = [{'Id': f'{i:012d}', 'Name': f'Workload {i}', 'Status': 'ACTIVE'} for i in range(1000)]
+        self.accounts.append({'Id': '999999999999', 'Name': 'Closed', 'Status': 'SUSPENDED'})
+
+    def get_paginator(self, operation):
+        return FakePaginator(getattr(self, f'_{operation}'))
+
+    def _list_accounts(self):
+        for i in range(0, len(self.accounts), 20):
+            yield {'Accounts': self.accounts[i:i + 20]}
+
+    def _list_accounts_for_parent(self, ParentId):
+        yield {'Accounts': self.accounts[:2] if ParentId == 'r-1' else self.accounts[2:5]}
+
+    def _list_organizational_units_for_parent(self, ParentId):
+        yield {'OrganizationalUnits': [{'Id': 'ou-1'}] if ParentId == 'r-1' else []}
+
+    def _list_tags_for_resource(self, ResourceId):
+        yield {'Tags': [{'Key': 'env', 'Value': 'prod' if int(ResourceId) % 2 else 'dev'}]}
+
+
+def test_stream_active_accounts():
+    client = OrganizationsClient(FakeOrganizations())
+
+    assert len(list(client.iter_accounts())) == 1000
+    assert [a['Id'] for a in client.iter_accounts(['r-1'])] == [f'{i:012d}' for i in range(5)]
+    assert len(list(client.iter_accounts(tags={'env': 'prod'}))) == 500
+
+
+def test_plan_and_apply_account_sync():
+    config = Configuration('role', '000000000000', stored_profiles=[
+        StoredProfile('acc-workload-0', '000000000000'),
+        StoredProfile('acc-workload-1', '123456789012'),
+    ])
+
+    accounts = OrganizationsClient(FakeOrganizations()).iter_accounts()
+    plan = plan_account_sync(config, accounts, 'acc-{name}')
+
+    assert plan.unchanged == 1
+    assert [(c.account_id, u.account_id) for c, u in plan.updated] == [('123456789012', '000000000001')]
+    assert len(plan.added) == 998
+    assert len(config.stored_profiles) == 2
+
+    apply_account_sync(config, plan)
+
+    assert len(config.stored_profiles) == 1000
+    assert config.find_profile('acc-workload-1').account_id == '000000000001'
+    assert config.find_profile('acc-workload-999').role_name == 'role'
+
+
+def test_plan_records_conflicting_and_empty_names():
+    config = Configuration('role', '000000000000')
+    accounts = [{'Id': '000000000001', 'Name': 'Sandbox'}, {'Id': '000000000002', 'Name': 'sandbox'},
+                {'Id': '000000000003', 'Name': '日本'}]
+
+    plan = plan_account_sync(config, accounts)
+
+    assert [p.name for p in plan.added] == ['sandbox']
+    assert plan.conflicts == [('sandbox', '000000000002', '000000000001')]
+    assert plan.unnamed == ['000000000003']
+    assert plan.has_conflicts
+    assert not plan_account_sync(config, accounts, '{name}-{id}').has_conflicts
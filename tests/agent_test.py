@@ -0,0 +1,122 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from aws_assume_role.agent import CredentialAgent, create_agent_server
+from aws_assume_role.authentication import Authorizer
+from aws_assume_role.configuration import Profile
+from aws_assume_role.exceptions import InvalidCredentialsException
+
+
+class StubStsClient:
+
+    def __init__(self):
+        self.calls = 0
+
+    def assume(self, profile: Profile, source_details=None):
+        self.calls += 1
+
+        return {
+            'Credentials': {
+                'AccessKeyId': f'key-{self.calls}',
+                'SecretAccessKey': 'secret',
+                'SessionToken': 'token',
+                'Expiration': datetime.now(timezone.utc) + timedelta(hours=1),
+            }
+        }
+
+
+@pytest.fixture
+def agent_endpoint():
+    sts_client = StubStsClient()
+    authorizer = Authorizer(sts_client, None, None)
+    agent = CredentialAgent(authorizer, [Profile('dev', '111111111111', 'role', 'default')], refresh_margin=900)
+    agent.refresh_due()
+
+    server = create_agent_server(agent, 'secret-token')
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f'http://127.0.0.1:{server.server_address[1]}', agent, sts_client
+
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url, token):
+    request = urllib.request.Request(url, headers={'Authorization': token})
+
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def test_serve_container_credentials(agent_endpoint):
+    url, _, _ = agent_endpoint
+
+    document = _get(f'{url}/dev', 'secret-token')
+
+    assert document['AccessKeyId'] == 'key-1'
+    assert document['Token'] == 'token'
+    assert datetime.fromisoformat(document['Expiration']) > datetime.now(timezone.utc)
+
+
+def test_reject_invalid_token(agent_endpoint):
+    url, _, _ = agent_endpoint
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _get(f'{url}/dev', 'other-token')
+
+    assert error.value.code == 401
+
+
+def test_not_refresh_far_from_expiration(agent_endpoint):
+    _, agent, sts_client = agent_endpoint
+
+    agent.refresh_due()
+
+    assert sts_client.calls == 1
+
+
+def test_refresh_close_to_expiration():
+    sts_client = StubStsClient()
+    authorizer = Authorizer(sts_client, None, None)
+    agent = CredentialAgent(authorizer, [Profile('dev', '111111111111', 'role', 'default')],
+                            refresh_margin=2 * 3600, retry_delay=0)
+
+    agent.refresh_due()
+    agent.refresh_due()
+
+    assert sts_client.calls == 2
+    assert agent.credentials('dev').access_key == 'key-2'
+
+
+class FailingStsClient:
+
+    def assume(self, profile: Profile, source_details=None):
+        raise InvalidCredentialsException('expired token')
+
+
+def test_report_refresh_errors(capsys):
+    agent = CredentialAgent(Authorizer(FailingStsClient(), None, None),
+                            [Profile('dev', '111111111111', 'role', 'default')], refresh_margin=900)
+    server = create_agent_server(agent, 'secret-token')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        agent.refresh_due()
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _get(f'http://127.0.0.1:{server.server_address[1]}/dev', 'secret-token')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert error.value.code == 503
+    assert json.load(error.value)['error'] == 'InvalidCredentialsException: expired token'
+    assert 'dev: refresh FAILED (InvalidCredentialsException: expired token)' in capsys.readouterr().err
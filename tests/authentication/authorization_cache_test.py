@@ -0,0 +1,105 @@
+from datetime import datetime, timezone, timedelta
+
+from aws_assume_role.authentication import Authorizer
+from aws_assume_role.authentication.authorization_cache import AuthorizationCache
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.cli.main import _get_parser, get_authorizer
+from aws_assume_role.configuration import Configuration, StoredProfile
+
+
+class CountingSts:
+
+    def __init__(self, lifetime=timedelta(hours=1)):
+        self.lifetime = lifetime
+        self.assumed = 0
+
+    def assume(self, profile, source_details=None):
+        self.assumed += 1
+
+        return {
+            'Credentials': {
+                'AccessKeyId': f'key-{self.assumed}',
+                'SecretAccessKey': 'secret',
+                'SessionToken': 'token',
+                'Expiration': datetime.now(timezone.utc) + self.lifetime,
+            }
+        }
+
+
+def build_config(tmp_path):
+    return Configuration('role', '000000000000', stored_profiles=[StoredProfile('dev', '111111111111')],
+                         cache_dir=str(tmp_path/'cache'))
+
+
+def details(expires_in: timedelta) -> AuthorizationDetails:
+    return AuthorizationDetails('key', 'secret', 'token', datetime.now(timezone.utc) + expires_in)
+
+
+def test_entries_are_served_until_the_refresh_margin(tmp_path):
+    cache = AuthorizationCache(tmp_path, 300)
+    profile = build_config(tmp_path).find_profile('dev')
+
+    cache.put(profile, details(timedelta(seconds=600)))
+    assert cache.get(profile).access_key == 'key'
+
+    cache.put(profile, details(timedelta(seconds=299)))
+    assert cache.get(profile) is None
+
+
+def test_entries_without_expiration_are_not_stored(tmp_path):
+    cache = AuthorizationCache(tmp_path, 300)
+    profile = build_config(tmp_path).find_profile('dev')
+
+    cache.put(profile, AuthorizationDetails('key', 'secret', 'token'))
+
+    assert cache.get(profile) is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_missing_and_corrupt_entries(tmp_path):
+    cache = AuthorizationCache(tmp_path, 300)
+    profile = build_config(tmp_path).find_profile('dev')
+
+    assert cache.get(profile) is None
+
+    cache.put(profile, details(timedelta(hours=1)))
+    entry_path, = tmp_path.iterdir()
+
+    entry_path.write_text('{not json')
+    assert cache.get(profile) is None
+
+    entry_path.write_text('{"unknown": 1}')
+    assert cache.get(profile) is None
+
+    entry_path.write_text('{"access_key": "key", "secret_key": "secret", "session_token": "token", '
+                          '"expiration": "yesterday"}')
+    assert cache.get(profile) is None
+
+
+def test_force_refresh_skips_the_cache_but_updates_it(tmp_path):
+    config = build_config(tmp_path)
+    sts = CountingSts()
+    authorizer = Authorizer(sts, config, None, AuthorizationCache(tmp_path, 300))
+    profile = config.find_profile('dev')
+
+    assert authorizer.authorize(profile)[1] is False
+    assert authorizer.authorize(profile) == (authorizer.request_details(profile), True)
+    assert authorizer.authorize(profile, force_refresh=True)[1] is False
+    assert authorizer.request_details(profile).access_key == 'key-2'
+    assert sts.assumed == 2
+
+
+def test_no_cache_never_touches_disk(tmp_path, monkeypatch):
+    monkeypatch.delenv('ASSUME_AWS_CACHE_DIR', raising=False)
+    config = build_config(tmp_path)
+    args = _get_parser().parse_args(['dev', '--no-cache'])
+
+    authorizer = get_authorizer(args, config, None)
+    authorizer.sts_client = CountingSts()
+
+    authorizer.request_details(config.find_profile('dev'))
+    authorizer.request_details(config.find_profile('dev'))
+
+    assert authorizer.cache is None
+    assert authorizer.sts_client.assumed == 2
+    assert not (tmp_path/'cache').exists()
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from aws_assume_role.authentication import Authorizer
+from aws_assume_role.configuration import Configuration, StoredProfile
+from aws_assume_role.exceptions import InvalidRoleChainException
+
+
+class RecordingSts:
+
+    def __init__(self):
+        self.assumed = []
+        self.lock = threading.Lock()
+
+    def assume(self, profile, source_details=None):
+        with self.lock:
+            self.assumed.append((profile.name, source_details.access_key if source_details else None))
+
+        return {
+            'Credentials': {
+                'AccessKeyId': f'key-{profile.name}',
+                'SecretAccessKey': 'secret',
+                'SessionToken': 'token',
+                'Expiration': datetime.now(timezone.utc) + timedelta(hours=1),
+            }
+        }
+
+
+def test_chained_profiles_share_the_source_hop():
+    config = Configuration('role', '000000000000', stored_profiles=[
+        StoredProfile('hub', '111111111111', 'security-hub'),
+        *[StoredProfile(f'workload-{i}', f'{i:012d}', source_profile='hub') for i in range(50)],
+    ])
+    sts = RecordingSts()
+    authorizer = Authorizer(sts, config, None)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: authorizer.request_details(config.find_profile(f'workload-{i}')), range(50)))
+
+    assert len(sts.assumed) == 51
+    assert sts.assumed.count(('hub', None)) == 1
+    assert all(source == 'key-hub' for name, source in sts.assumed if name != 'hub')
+
+
+def test_reject_cyclic_chains():
+    config = Configuration('role', '000000000000', stored_profiles=[
+        StoredProfile('a', '111111111111', source_profile='b'),
+        StoredProfile('b', '222222222222', source_profile='a'),
+    ])
+    authorizer = Authorizer(RecordingSts(), config, None)
+
+    with pytest.raises(InvalidRoleChainException):
+        authorizer.request_details(config.find_profile('a'))
@@ -0,0 +1,33 @@
+import json
+from datetime import datetime, timezone
+
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.authentication.authorization_writer import ProcessCredentialsAuthorizationWriter
+from aws_assume_role.configuration import Configuration, Profile
+
+PROFILE = Profile('dev', '111111111111', 'role', 'default')
+
+
+def process_output(details: AuthorizationDetails) -> dict:
+    output = []
+    ProcessCredentialsAuthorizationWriter(Configuration('role', '000000000000'), output.append) \
+        .write(details, PROFILE, 'eu-west-1')
+
+    assert len(output) == 1
+    return json.loads(output[0])
+
+
+def test_process_credentials_document():
+    details = AuthorizationDetails('key', 'secret', 'token', datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    assert process_output(details) == {
+        'Version': 1,
+        'AccessKeyId': 'key',
+        'SecretAccessKey': 'secret',
+        'SessionToken': 'token',
+        'Expiration': '2024-01-01T00:00:00+00:00',
+    }
+
+
+def test_process_credentials_document_without_expiration():
+    assert 'Expiration' not in process_output(AuthorizationDetails('key', 'secret', 'token'))
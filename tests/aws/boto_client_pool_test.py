@@ -0,0 +1,66 @@
+import os
+import textwrap
+
+from aws_assume_role.aws import BotoClientPool, default_boto_client_factory
+from aws_assume_role.configuration import Configuration, Profile
+
+CREDENTIALS = textwrap.dedent('''\
+    [default]
+    aws_access_key_id = AKIADEFAULT
+    aws_secret_access_key = secret
+
+    [other]
+    aws_access_key_id = AKIAOTHER
+    aws_secret_access_key = secret
+    ''')
+
+
+def aws_files(tmp_path):
+    (tmp_path/'config').write_text('')
+    (tmp_path/'credentials').write_text(CREDENTIALS)
+
+    return str(tmp_path/'config'), str(tmp_path/'credentials')
+
+
+def test_clients_are_keyed_by_profile_region_and_files(tmp_path):
+    pool = BotoClientPool()
+    files = aws_files(tmp_path)
+    (tmp_path/'other').mkdir()
+    other_files = aws_files(tmp_path/'other')
+
+    client = pool.client('sts', 'default', 'eu-west-1', *files)
+
+    assert pool.client('sts', 'default', 'eu-west-1', *files) is client
+    assert pool.client('sts', 'other', 'eu-west-1', *files) is not client
+    assert pool.client('sts', 'default', 'us-east-1', *files) is not client
+    assert pool.client('sts', 'default', 'eu-west-1', *other_files) is not client
+    assert pool.client('sts', 'default', 'eu-west-1', *files, max_attempts=1) is not client
+    assert pool.session('default', *files) is pool.session('default', *files)
+
+
+def test_least_recently_used_clients_are_evicted(tmp_path):
+    pool = BotoClientPool(max_size=2)
+    files = aws_files(tmp_path)
+
+    first = pool.client('sts', 'default', 'eu-west-1', *files)
+    second = pool.client('sts', 'default', 'us-east-1', *files)
+
+    assert pool.client('sts', 'default', 'eu-west-1', *files) is first
+
+    pool.client('sts', 'default', 'ap-south-1', *files)
+
+    assert pool.client('sts', 'default', 'eu-west-1', *files) is first
+    assert pool.client('sts', 'default', 'us-east-1', *files) is not second
+
+
+def test_factory_does_not_mutate_the_environment(tmp_path):
+    config_file, credentials_file = aws_files(tmp_path)
+    configuration = Configuration('role', '000000000000', aws_config_file=config_file,
+                                  aws_credentials_file=credentials_file)
+    environment = dict(os.environ)
+
+    client = default_boto_client_factory('sts', Profile('dev', '111111111111', 'role', 'other'), configuration,
+                                         'eu-west-1')
+
+    assert dict(os.environ) == environment
+    assert client._request_signer._credentials.access_key == 'AKIAOTHER'
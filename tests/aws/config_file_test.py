@@ -0,0 +1,43 @@
+import textwrap
+
+from aws_assume_role.aws.config_file import write_credential_process
+from aws_assume_role.configuration import Configuration
+
+AWS_CONFIG = textwrap.dedent('''\
+    # Managed by hand
+    [default]
+    region = eu-west-1
+
+    [profile dev]
+    output = json
+    credential_process = old --process dev
+
+    [sso-session corp]
+    sso_start_url = https://corp.awsapps.com/start
+    ''')
+
+
+def test_write_credential_process_sections(tmp_path):
+    path = tmp_path/'config'
+    path.write_text(AWS_CONFIG)
+    config = Configuration('role', '000000000000', aws_config_file=str(path))
+
+    write_credential_process(config, ['default', 'dev', 'qa'], 'aws-assume-role')
+
+    assert path.read_text() == textwrap.dedent('''\
+        # Managed by hand
+        [default]
+        region = eu-west-1
+        credential_process = aws-assume-role --process default
+
+        [profile dev]
+        output = json
+        credential_process = aws-assume-role --process dev
+
+        [sso-session corp]
+        sso_start_url = https://corp.awsapps.com/start
+
+        [profile qa]
+        credential_process = aws-assume-role --process qa
+
+        ''')
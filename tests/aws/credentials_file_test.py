@@ -0,0 +1,39 @@
+import textwrap
+from datetime import datetime, timezone
+
+from aws_assume_role.aws.credentials_file import read_credentials_status, remove_expired_sections
+from aws_assume_role.utils.ini_file import IniDocument
+
+NOW = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+CREDENTIALS = textwrap.dedent('''\
+    [default]
+    aws_access_key_id = AKIA
+
+    [fresh]
+    aws_session_expiration = 2024-01-01T14:00:00+00:00
+
+    [expiring]
+    aws_session_expiration = 2024-01-01T12:10:00+00:00
+
+    [expired]
+    aws_session_expiration = 2024-01-01T11:00:00+00:00
+    ''')
+
+
+def test_status_of_each_profile(tmp_path):
+    path = tmp_path/'credentials'
+    path.write_text(CREDENTIALS)
+
+    statuses = read_credentials_status(path, ['default', 'fresh', 'expiring', 'expired', 'missing'])
+
+    assert [s.state(NOW, 900) for s in statuses] == ['unknown', 'valid', 'expiring', 'expired', 'missing']
+    assert statuses[1].remaining(NOW) == 7200
+    assert [s.name for s in statuses if s.needs_refresh(NOW, 900)] == ['default', 'expiring', 'expired', 'missing']
+
+
+def test_remove_only_expired_sections():
+    document = IniDocument.parse(CREDENTIALS)
+
+    assert remove_expired_sections(document, NOW) == ['expired']
+    assert document.sections() == ['default', 'fresh', 'expiring']
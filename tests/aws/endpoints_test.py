@@ -0,0 +1,138 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import EndpointConnectionError
+
+from aws_assume_role.aws.endpoints import StsEndpointResolver, UNREACHABLE_TTL
+from aws_assume_role.aws.sts import StsClient
+from aws_assume_role.configuration import Profile
+
+
+class FakeProbe:
+
+    def __init__(self, latencies):
+        self.latencies = latencies
+        self.calls = 0
+
+    def __call__(self, endpoint_url, timeout):
+        self.calls += 1
+        latency = self.latencies[endpoint_url]
+
+        if latency is None:
+            raise OSError('unreachable')
+
+        return latency
+
+
+def _profile(sts_region=None, sts_endpoint_url=None):
+    return Profile('dev', '111111111111', 'role', 'default', sts_region, sts_endpoint_url)
+
+
+def test_resolve_fixed_region_and_custom_endpoint(tmp_path):
+    resolver = StsEndpointResolver([], tmp_path/'sts.json', 60)
+
+    assert resolver.resolve(_profile()) == (None, None)
+    assert resolver.resolve(_profile('eu-west-1')) == ('eu-west-1', 'https://sts.eu-west-1.amazonaws.com')
+    assert resolver.resolve(_profile('eu-west-1', 'http://localhost:5000')) == ('eu-west-1', 'http://localhost:5000')
+
+
+def test_auto_region_uses_cached_fastest_endpoint(tmp_path):
+    probe = FakeProbe({
+        'https://sts.us-east-1.amazonaws.com': 0.120,
+        'https://sts.eu-west-1.amazonaws.com': 0.015,
+        'https://sts.eu-central-1.amazonaws.com': None,
+    })
+    regions = ['us-east-1', 'eu-west-1', 'eu-central-1']
+
+    resolver = StsEndpointResolver(regions, tmp_path/'sts.json', 60, probe=probe)
+    assert resolver.resolve(_profile('auto'))[0] == 'eu-west-1'
+    assert probe.calls == 3
+
+    resolver = StsEndpointResolver(regions, tmp_path/'sts.json', 60, probe=probe)
+    assert resolver.resolve(_profile('auto'))[0] == 'eu-west-1'
+    assert probe.calls == 3
+
+
+def test_auto_region_falls_back_without_network(tmp_path):
+    probe = FakeProbe({'https://sts.us-east-1.amazonaws.com': None})
+    resolver = StsEndpointResolver(['us-east-1'], tmp_path/'sts.json', 60, probe=probe)
+
+    assert resolver.resolve(_profile('auto')) == (None, None)
+
+
+def test_unreachable_regions_are_cached_for_a_short_time(tmp_path, monkeypatch):
+    probe = FakeProbe({'https://sts.us-east-1.amazonaws.com': None})
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now)
+
+    StsEndpointResolver(['us-east-1'], tmp_path/'sts.json', 3600, probe=probe).fastest_region()
+    assert StsEndpointResolver(['us-east-1'], tmp_path/'sts.json', 3600, probe=probe).fastest_region() is None
+    assert probe.calls == 1
+
+    monkeypatch.setattr(time, 'time', lambda: now + UNREACHABLE_TTL)
+    probe.latencies['https://sts.us-east-1.amazonaws.com'] = 0.050
+
+    assert StsEndpointResolver(['us-east-1'], tmp_path/'sts.json', 3600, probe=probe).fastest_region() == 'us-east-1'
+    assert probe.calls == 2
+
+
+def test_concurrent_lookups_measure_once(tmp_path):
+    probe = FakeProbe({'https://sts.us-east-1.amazonaws.com': 0.120, 'https://sts.eu-west-1.amazonaws.com': 0.015})
+    resolver = StsEndpointResolver(['us-east-1', 'eu-west-1'], tmp_path/'sts.json', 60,
+                                   probe=lambda url, timeout: time.sleep(0.05) or probe(url, timeout))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        regions = list(executor.map(lambda _: resolver.fastest_region(), range(8)))
+
+    assert regions == ['eu-west-1'] * 8
+    assert probe.calls == 2
+
+
+class UnreachableRegionStsClient:
+
+    def __init__(self, unreachable):
+        self.unreachable = unreachable
+        self.regions = []
+
+    def factory(self, region):
+
+        def assume_role(**_):
+            self.regions.append(region)
+
+            if region in self.unreachable:
+                raise EndpointConnectionError(endpoint_url=str(region))
+
+            return {'Credentials': {}}
+
+        return SimpleNamespace(assume_role=assume_role, get_caller_identity=lambda: {'Account': '000000000000'})
+
+
+def test_unreachable_auto_region_falls_back_to_the_next_one(tmp_path):
+    probe = FakeProbe({
+        'https://sts.us-east-1.amazonaws.com': 0.120,
+        'https://sts.eu-west-1.amazonaws.com': 0.015,
+        'https://sts.eu-central-1.amazonaws.com': 0.030,
+    })
+    resolver = StsEndpointResolver(['us-east-1', 'eu-west-1', 'eu-central-1'], tmp_path/'sts.json', 60, probe=probe)
+    boto_client = UnreachableRegionStsClient({'eu-west-1', 'eu-central-1'})
+    sts = StsClient(lambda profile, credentials: boto_client.factory(resolver.resolve(profile)[0]), None)
+    sts.endpoint_resolver = resolver
+
+    sts.assume(_profile('auto'))
+
+    assert boto_client.regions == ['eu-west-1', 'eu-central-1', 'us-east-1']
+    assert StsEndpointResolver(resolver.candidate_regions, tmp_path/'sts.json', 60).fastest_region() == 'us-east-1'
+
+    boto_client.unreachable.add('us-east-1')
+    sts.assume(_profile('auto'))
+
+    assert boto_client.regions[3:] == ['us-east-1', None]
+
+    boto_client.unreachable.add(None)
+
+    with pytest.raises(EndpointConnectionError):
+        sts.assume(_profile('auto'))
+
+    assert boto_client.regions[5:] == [None]
@@ -0,0 +1,95 @@
+import time
+from types import SimpleNamespace
+
+import botocore.session
+from botocore import UNSIGNED
+from botocore.config import Config
+
+from aws_assume_role.aws import credentials_fingerprint
+from aws_assume_role.aws.identity_cache import IdentityCache
+from aws_assume_role.aws.sts import StsClient
+from aws_assume_role.configuration import Profile
+
+
+def boto_client(access_key='AKIA1', secret_key='secret'):
+    return botocore.session.Session().create_client('sts', region_name='us-east-1', aws_access_key_id=access_key,
+                                                    aws_secret_access_key=secret_key)
+
+
+class CallerIdentityStsClient:
+
+    def __init__(self, access_key, account='000000000000'):
+        credentials = SimpleNamespace(get_frozen_credentials=lambda: SimpleNamespace(access_key=access_key))
+        self._request_signer = SimpleNamespace(_credentials=credentials)
+        self.account = account
+        self.identity_calls = 0
+
+    def get_caller_identity(self):
+        self.identity_calls += 1
+        return {'Account': self.account}
+
+    def assume_role(self, **_):
+        return {'Credentials': {}}
+
+
+def test_fingerprint_depends_only_on_the_access_key():
+    assert credentials_fingerprint(boto_client()) == credentials_fingerprint(boto_client(secret_key='other'))
+    assert credentials_fingerprint(boto_client()) != credentials_fingerprint(boto_client('AKIA2'))
+    assert 'AKIA1' not in credentials_fingerprint(boto_client())
+
+
+def test_fingerprint_of_client_without_credentials():
+    unsigned = botocore.session.Session().create_client('sts', region_name='us-east-1',
+                                                        config=Config(signature_version=UNSIGNED))
+
+    assert credentials_fingerprint(unsigned) is None
+    assert credentials_fingerprint(object()) is None
+
+
+def test_entries_per_aws_profile_and_fingerprint(tmp_path):
+    cache = IdentityCache(tmp_path/'identities.json', 60)
+
+    cache.put('default', 'a', '000000000000')
+    cache.put('other', 'a', '111111111111')
+
+    assert cache.get('default', 'a') == '000000000000'
+    assert cache.get('other', 'a') == '111111111111'
+    assert cache.get('default', 'b') is None
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    cache = IdentityCache(tmp_path/'identities.json', 60)
+    now = time.time()
+
+    monkeypatch.setattr(time, 'time', lambda: now)
+    cache.put('default', 'a', '000000000000')
+
+    monkeypatch.setattr(time, 'time', lambda: now + 59)
+    assert cache.get('default', 'a') == '000000000000'
+
+    monkeypatch.setattr(time, 'time', lambda: now + 60)
+    assert cache.get('default', 'a') is None
+
+
+def test_identity_is_verified_once_per_ttl(tmp_path):
+    client = CallerIdentityStsClient('AKIA1')
+    sts = StsClient(lambda profile, credentials: client, '000000000000',
+                    identity_cache=IdentityCache(tmp_path/'identities.json', 60))
+    profile = Profile('dev', '111111111111', 'role', 'default')
+
+    sts.assume(profile)
+    sts.assume(profile)
+
+    assert client.identity_calls == 1
+
+
+def test_verify_identity_bypasses_the_cache(tmp_path):
+    client = CallerIdentityStsClient('AKIA1')
+    sts = StsClient(lambda profile, credentials: client, '000000000000',
+                    identity_cache=IdentityCache(tmp_path/'identities.json', 60), verify_identity=True)
+    profile = Profile('dev', '111111111111', 'role', 'default')
+
+    sts.assume(profile)
+    sts.assume(profile)
+
+    assert client.identity_calls == 2
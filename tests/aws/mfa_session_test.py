@@ -0,0 +1,97 @@
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+from aws_assume_role.aws.mfa_session import MfaSessionProvider, MfaSessionCache
+from aws_assume_role.aws.sts import StsClient
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.configuration import Profile
+
+PROFILE = Profile('dev', '111111111111', 'role', 'landing', mfa_serial='arn:aws:iam::000000000000:mfa/user')
+
+
+class LandingStsClient:
+
+    def __init__(self, access_key):
+        self.access_key = access_key
+        self.session_tokens = []
+        self.assumed_with = []
+        self.lock = threading.Lock()
+
+    def get_session_token(self, SerialNumber, TokenCode, DurationSeconds):
+        with self.lock:
+            self.session_tokens.append((SerialNumber, TokenCode, DurationSeconds))
+
+        return {'Credentials': {'AccessKeyId': 'mfa-key', 'SecretAccessKey': 'secret', 'SessionToken': 'token',
+                                'Expiration': datetime.now(timezone.utc) + timedelta(hours=12)}}
+
+    def get_caller_identity(self):
+        return {'Account': '000000000000'}
+
+    def assume_role(self, RoleArn, RoleSessionName):
+        with self.lock:
+            self.assumed_with.append(self.access_key)
+
+        return {'Credentials': {}}
+
+
+class FailingKeyring:
+
+    def get_password(self, service, key):
+        raise RuntimeError('No recommended backend was available')
+
+    def set_password(self, service, key, password):
+        raise RuntimeError('No recommended backend was available')
+
+
+class CorruptKeyring:
+
+    def get_password(self, service, key):
+        return '{not json'
+
+
+def test_unusable_keyring_falls_back_to_files(tmp_path):
+    cache = MfaSessionCache(tmp_path, 300)
+    cache.keyring = FailingKeyring()
+    details = AuthorizationDetails('mfa-key', 'secret', 'token', datetime.now(timezone.utc) + timedelta(hours=1))
+
+    assert cache.get(PROFILE) is None
+
+    cache.put(PROFILE, details)
+
+    assert cache.get(PROFILE).access_key == 'mfa-key'
+    assert MfaSessionCache(tmp_path, 300).get(PROFILE).access_key == 'mfa-key'
+
+
+def test_corrupt_keyring_entry_is_a_miss(tmp_path):
+    cache = MfaSessionCache(tmp_path, 300)
+    cache.keyring = CorruptKeyring()
+
+    assert cache.get(PROFILE) is None
+
+
+def test_single_mfa_prompt_for_concurrent_assumes(tmp_path):
+    clients = {}
+    prompts = []
+
+    def factory(profile, credentials):
+        access_key = credentials.access_key if credentials is not None else 'landing-key'
+        return clients.setdefault(access_key, LandingStsClient(access_key))
+
+    def provider():
+        return MfaSessionProvider(lambda serial: prompts.append(serial) or '123456', 43200,
+                                  MfaSessionCache(tmp_path, 300))
+
+    sts = StsClient(factory, None, mfa_session_provider=provider())
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: sts.assume(PROFILE), range(20)))
+
+    # A new process reuses the cached MFA session
+    StsClient(factory, None, mfa_session_provider=provider()).assume(PROFILE)
+
+    assert prompts == [PROFILE.mfa_serial]
+    assert clients['landing-key'].session_tokens == [(PROFILE.mfa_serial, '123456', 43200)]
+    assert clients['mfa-key'].assumed_with == ['mfa-key'] * 21
+    assert [stat.S_IMODE(p.stat().st_mode) for p in tmp_path.iterdir() if p.suffix == '.json'] == [0o600]
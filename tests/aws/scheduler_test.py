@@ -0,0 +1,141 @@
+import dataclasses
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from botocore.exceptions import ClientError
+
+from aws_assume_role.aws.scheduler import StsRequestScheduler, AdaptiveConcurrencyLimiter
+from aws_assume_role.aws.sts import StsClient
+from aws_assume_role.configuration import Profile
+from aws_assume_role.exceptions import RequestDeadlineExceededException
+
+
+class ThrottlingError(Exception):
+
+    def __init__(self):
+        super().__init__('Rate exceeded')
+        self.response = {'Error': {'Code': 'Throttling'}}
+
+
+class FakeSts:
+    """
+    Boto STS client answering after the latency, throttling every request over max_in_flight concurrent ones
+    """
+
+    def __init__(self, latency: float = 0.01, max_in_flight: int = 100):
+        self.latency = latency
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_caller_identity(self):
+        return {**self.assume_role(), 'Account': '000000000000'}
+
+    def assume_role(self, **_):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            throttled = self.in_flight > self.max_in_flight
+
+        try:
+            time.sleep(self.latency)
+
+            if throttled:
+                raise ThrottlingError()
+
+            return {'Credentials': {}}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+PROFILE = Profile('dev', '111111111111', 'role', 'landing')
+
+
+def scheduled(boto_client, scheduler: StsRequestScheduler) -> StsClient:
+    return StsClient(lambda profile, credentials: boto_client, None, request_scheduler=scheduler)
+
+
+def test_retry_throttled_requests():
+    sts = FakeSts(max_in_flight=2)
+    scheduler = StsRequestScheduler(rate=1000, max_concurrency=8, max_attempts=20, retry_budget=200, base_delay=0.01)
+    sts_client = scheduled(sts, scheduler)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: sts_client.assume(PROFILE), range(16)))
+
+    assert len(results) == 16
+    assert scheduler.stats.throttles > 0
+    assert scheduler.stats.requests == sts.calls
+    assert scheduler.stats.service_time > 0
+
+
+def test_retry_budget_stops_retries():
+    sts = FakeSts(max_in_flight=0)
+    scheduler = StsRequestScheduler(rate=1000, max_attempts=10, retry_budget=2, base_delay=0.001)
+    sts_client = scheduled(sts, scheduler)
+
+    with pytest.raises(ThrottlingError):
+        sts_client.assume(PROFILE)
+
+    assert sts.calls == 3
+
+
+def test_not_retry_other_errors():
+    class FailingSts:
+        def get_caller_identity(self):
+            raise ValueError()
+
+    scheduler = StsRequestScheduler()
+    sts_client = scheduled(FailingSts(), scheduler)
+
+    with pytest.raises(ValueError):
+        sts_client.assume(PROFILE)
+
+    assert scheduler.stats.failures == 1
+
+
+def test_rejected_session_durations_are_not_failures():
+    class MaxDurationSts(FakeSts):
+        def assume_role(self, DurationSeconds=None, **_):
+            if DurationSeconds is not None and DurationSeconds > 14400:
+                raise ClientError({'Error': {'Code': 'ValidationError', 'Message': 'The requested DurationSeconds '
+                                             'exceeds the MaxSessionDuration set for this role.'}}, 'AssumeRole')
+
+            return super().assume_role()
+
+    scheduler = StsRequestScheduler()
+    sts_client = scheduled(MaxDurationSts(latency=0), scheduler)
+
+    sts_client.assume(dataclasses.replace(PROFILE, duration_seconds='auto'))
+
+    assert scheduler.stats.requests == 4
+    assert scheduler.stats.failures == 0
+
+
+def test_deadline_while_rate_limited():
+    scheduler = StsRequestScheduler(rate=1, timeout=0.1)
+    sts_client = scheduled(FakeSts(latency=0), scheduler)
+
+    # Each STS request takes a token, the assume needs two of them: get_caller_identity and assume_role
+    with pytest.raises(RequestDeadlineExceededException):
+        sts_client.assume(PROFILE)
+
+    assert scheduler.stats.requests == 1
+
+
+def test_concurrency_limit_is_aimd():
+    limiter = AdaptiveConcurrencyLimiter(8, 8)
+
+    limiter.acquire(time.monotonic())
+    limiter.release(throttled=True)
+    assert int(limiter.limit) == 4
+
+    for _ in range(5):
+        limiter.acquire(time.monotonic())
+        limiter.release(throttled=False)
+
+    assert int(limiter.limit) == 5
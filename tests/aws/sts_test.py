@@ -0,0 +1,51 @@
+from botocore.exceptions import ClientError
+
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.aws.session_duration import SessionDurationCache
+from aws_assume_role.aws.sts import StsClient
+from aws_assume_role.configuration import Profile
+
+ROLE_ARN = 'arn:aws:iam::111111111111:role/role'
+
+
+class MaxDurationStsClient:
+
+    def __init__(self, max_duration):
+        self.max_duration = max_duration
+        self.requested = []
+
+    def assume_role(self, RoleArn, RoleSessionName, DurationSeconds=None):
+        self.requested.append(DurationSeconds)
+
+        if DurationSeconds is not None and DurationSeconds > self.max_duration:
+            raise ClientError({'Error': {'Code': 'ValidationError', 'Message': 'The requested DurationSeconds '
+                                         'exceeds the MaxSessionDuration set for this role.'}}, 'AssumeRole')
+
+        return {'Credentials': {}}
+
+    def get_caller_identity(self):
+        return {'Account': '000000000000'}
+
+
+def test_auto_duration_is_discovered_once_per_role(tmp_path):
+    boto_client = MaxDurationStsClient(20000)
+    sts = StsClient(lambda profile, credentials: boto_client, None,
+                    session_duration_cache=SessionDurationCache(tmp_path/'durations.json', 3600))
+    profile = Profile('dev', '111111111111', 'role', 'default', duration_seconds='auto')
+
+    sts.assume(profile, AuthorizationDetails('key', 'secret', 'token'))
+    sts.assume(profile)
+    sts.assume(profile)
+
+    assert boto_client.requested == [3600, 43200, 28800, 14400, 14400]
+    assert sts.session_duration_cache.get(ROLE_ARN) == 14400
+
+
+def test_fixed_duration_is_capped_on_chained_hops():
+    boto_client = MaxDurationStsClient(43200)
+    sts = StsClient(lambda profile, credentials: boto_client, None)
+    profile = Profile('dev', '111111111111', 'role', 'default', duration_seconds='28800')
+
+    sts.assume(profile, AuthorizationDetails('key', 'secret', 'token'))
+
+    assert boto_client.requested == [3600]
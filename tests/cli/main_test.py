@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import pytest
+
+from aws_assume_role.authentication import AuthorizationDetails
+from aws_assume_role.authentication.authorization_cache import AuthorizationCache
+from aws_assume_role.cli.main import _get_parser, run, program_command
+from aws_assume_role.configuration import Configuration
+
+HEAVY_MODULES = ('boto3', 'botocore', 'pyperclip')
+
+PROJECT_PATH = Path(__file__).parents[2]
+
+
+def _imported_modules(*args, cache_dir) -> set:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'aws_assume_role.cli.main', *args],
+        capture_output=True, text=True, cwd=PROJECT_PATH, env={**os.environ, 'ASSUME_AWS_CACHE_DIR': str(cache_dir)},
+    )
+
+    assert result.returncode == 0, result.stderr
+
+    # Each line of -X importtime is "import time: self | cumulative | package"
+    lines = [line.split('|')[-1] for line in result.stderr.splitlines() if line.startswith('import time:')]
+
+    return {line.strip() for line in lines}
+
+
+CONFIG = {
+    'aws_default_role_name': 'role',
+    'aws_landing_account_id': '000000000000',
+    'stored_profiles': [{'name': 'dev', 'account_id': '111111111111'}],
+}
+
+
+def test_list_does_not_import_aws_sdk(tmp_path):
+    config_path = tmp_path/'config.json'
+    config_path.write_text(json.dumps(CONFIG))
+
+    modules = _imported_modules('--list', '--config-path', str(config_path), cache_dir=tmp_path/'cache')
+
+    assert 'aws_assume_role.configuration' in modules
+    assert not [m for m in modules if m.split('.')[0] in HEAVY_MODULES]
+
+
+def test_cached_process_credentials_do_not_import_aws_sdk(tmp_path):
+    config_path = tmp_path/'config.json'
+    config_path.write_text(json.dumps(CONFIG))
+
+    config = Configuration.from_dict(json.loads(json.dumps(CONFIG)))
+    config.cache_dir = str(tmp_path/'cache')
+
+    details = AuthorizationDetails('key', 'secret', 'token', datetime.now(timezone.utc) + timedelta(hours=1))
+    AuthorizationCache.from_configuration(config).put(config.find_profile('dev'), details)
+
+    modules = _imported_modules('--process', 'dev', '--config-path', str(config_path),
+                                cache_dir=config.cache_dir)
+
+    assert not [m for m in modules if m.split('.')[0] in HEAVY_MODULES]
+
+
+def test_program_command_quotes_the_absolute_config_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert program_command(Path('my configs')/'config.json') == \
+        f"aws-assume-role --config-path '{tmp_path.resolve()}/my configs/config.json'"
+
+
+def test_tag_argument():
+    parser = _get_parser()
+
+    assert parser.parse_args(['--sync-accounts', '--tag', 'env=prod', '--tag', 'team=a=b']).tag == \
+        [('env', 'prod'), ('team', 'a=b')]
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--sync-accounts', '--tag', 'env'])
+
+
+def test_reject_exports_sink_on_batch(capsys):
+    parser = _get_parser()
+
+    with pytest.raises(SystemExit):
+        run(parser, parser.parse_args(['dev', 'qa', '--sink', 'exports']))
+
+    with pytest.raises(SystemExit):
+        run(parser, parser.parse_args(['--prefetch', '--sink', 'exports']))
+
+    assert '--sink exports' in capsys.readouterr().err
+
+
+def test_reject_agent_without_profiles(capsys):
+    parser = _get_parser()
+
+    with pytest.raises(SystemExit):
+        run(parser, parser.parse_args(['--agent']))
+
+    assert '--agent' in capsys.readouterr().err
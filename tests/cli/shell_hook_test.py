@@ -0,0 +1,30 @@
+import shutil
+import stat
+import subprocess
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.authentication.authorization_writer import EnvSnapshotAuthorizationWriter
+from aws_assume_role.cli.shell_hook import render_shell_hook
+from aws_assume_role.configuration import Configuration, Profile
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason='bash is not installed')
+def test_bash_hook_sources_fresh_snapshot_without_running_the_program(tmp_path):
+    config = Configuration('role', '000000000000', cache_dir=str(tmp_path))
+    expiration = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    EnvSnapshotAuthorizationWriter(config).write(AuthorizationDetails('key', 'secret', 'token', expiration),
+                                                 Profile('dev', '111111111111', 'role', 'default'), 'eu-west-1')
+
+    snapshot = EnvSnapshotAuthorizationWriter.snapshot_dir(config)/'dev.sh'
+    assert stat.S_IMODE(snapshot.stat().st_mode) == 0o600
+    assert snapshot.read_text().startswith(f'# expires {int(expiration.timestamp())} dev\n')
+
+    hook = render_shell_hook('bash', snapshot.parent, 300, 'false')
+    output = subprocess.run(['bash', '-c', f'{hook}\naws_assume dev && echo "$AWS_ACCESS_KEY_ID $AWS_DEFAULT_REGION"'],
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output == 'key eu-west-1\n'
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.authentication.authorization_writer import MultiAuthorizationWriter
+from aws_assume_role.cli.exceptions import InvalidArgumentsException
+from aws_assume_role.cli.sinks import create_sinks_writer
+from aws_assume_role.configuration import Configuration, Profile
+from aws_assume_role.exceptions import SinkWriteException, SinkPathTemplateException
+
+DETAILS = AuthorizationDetails('key', 'secret', 'token', datetime(2024, 1, 1, tzinfo=timezone.utc))
+PROFILE = Profile('dev', '111111111111', 'role', 'default')
+
+
+def test_fan_out_to_every_sink(tmp_path):
+    config = Configuration('role', '000000000000', aws_credentials_file=str(tmp_path/'credentials'),
+                           cache_dir=str(tmp_path/'cache'))
+    writer = create_sinks_writer(['credentials', f'dotenv:{tmp_path}/{{profile}}.env', f'json:{tmp_path}/creds.json',
+                                  'process-cache'], config)
+
+    writer.write(DETAILS, PROFILE, 'eu-west-1')
+
+    assert 'aws_session_token = token' in (tmp_path/'credentials').read_text()
+    assert 'AWS_DEFAULT_REGION=eu-west-1\n' in (tmp_path/'dev.env').read_text()
+    assert json.loads((tmp_path/'creds.json').read_text())['Expiration'] == '2024-01-01T00:00:00+00:00'
+    assert len(list((tmp_path/'cache'/'credentials').iterdir())) == 1
+
+
+def test_failed_sinks_are_reported_after_writing_the_others(tmp_path):
+    (tmp_path/'file').write_text('')
+    config = Configuration('role', '000000000000')
+    writer = create_sinks_writer([f'dotenv:{tmp_path}/file/.env', f'json:{tmp_path}/creds.json'], config)
+
+    assert isinstance(writer, MultiAuthorizationWriter)
+
+    with pytest.raises(SinkWriteException) as error:
+        writer.write(DETAILS, PROFILE, None)
+
+    assert list(error.value.failures) == [f'dotenv:{tmp_path}/file/.env']
+    assert (tmp_path/'creds.json').exists()
+
+
+def test_batch_needs_the_profile_placeholder(tmp_path):
+    config = Configuration('role', '000000000000')
+    writer = create_sinks_writer([f'dotenv:{tmp_path}/{{profile}}.env', f'json:{tmp_path}/creds.json'], config)
+    qa = Profile('qa', '222222222222', 'role', 'default')
+
+    with pytest.raises(SinkWriteException) as error:
+        writer.write_batch([(DETAILS, PROFILE), (DETAILS, qa)], None)
+
+    assert isinstance(error.value.failures[f'json:{tmp_path}/creds.json'], SinkPathTemplateException)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['dev.env', 'qa.env']
+
+
+def test_invalid_sink():
+    with pytest.raises(InvalidArgumentsException):
+        create_sinks_writer(['dotenv'], Configuration('role', '000000000000'))
@@ -0,0 +1,59 @@
+import json
+
+from aws_assume_role import configuration
+from aws_assume_role.configuration import Configuration, StoredProfile
+
+
+def _config(profiles: int) -> Configuration:
+    return Configuration('role', '000000000000',
+                         stored_profiles=[StoredProfile(f'p{i}', f'{i:012d}') for i in range(profiles)])
+
+
+def test_profile_index_follows_add_edit_and_delete():
+    config = _config(3)
+
+    config.add_profile(StoredProfile('new', '999999999999', 'admin'))
+    assert config.find_profile('new').role_name == 'admin'
+
+    config.edit_profile('new', 'name', 'renamed')
+    assert config.find_profile('new') is None
+    assert config.find_profile('renamed').account_id == '999999999999'
+
+    config.del_profile('p1')
+    assert config.find_stored_profile('p1') is None
+    assert config.find_stored_profile('p2').account_id == '000000000002'
+
+
+def test_profile_index_detects_direct_list_changes():
+    config = _config(2)
+    assert config.find_profile('p0') is not None
+
+    config.stored_profiles.append(StoredProfile('direct', '111111111111'))
+
+    assert config.find_profile('direct').role_name == 'role'
+
+
+def test_compiled_config_is_invalidated_on_change(tmp_path, monkeypatch):
+    monkeypatch.setenv('ASSUME_AWS_CACHE_DIR', str(tmp_path/'cache'))
+    config_path = tmp_path/'config.json'
+
+    configuration.write_config(config_path, _config(5))
+    assert configuration.read_config(config_path).find_profile('p4') is not None
+    assert list((tmp_path/'cache'/'config').glob('*.pickle'))
+
+    config = configuration.read_config(config_path)
+    config.add_profile(StoredProfile('extra', '555555555555'))
+    configuration.write_config(config_path, config)
+
+    assert configuration.read_config(config_path).find_profile('extra') is not None
+    assert '_profiles_index_cache' not in json.loads(config_path.read_text())
+
+
+def test_profile_index_detects_direct_renames():
+    config = _config(2)
+    assert config.find_profile('p0') is not None
+
+    config.stored_profiles[0].name = 'renamed'
+
+    assert config.find_profile('p0') is None
+    assert config.find_profile('renamed').account_id == '000000000000'
@@ -0,0 +1,53 @@
+from aws_assume_role.authentication import AuthorizationDetails
+from aws_assume_role.configuration import Configuration, StoredProfile
+from aws_assume_role.exceptions import ProfileNotConfiguredException, InvalidCredentialsException
+from aws_assume_role.manager import ProfileAuthenticationManager
+from aws_assume_role.usage_history import UsageHistory
+
+
+class FailingAuthorizer:
+
+    def __init__(self, failing):
+        self.failing = failing
+
+    def authorize(self, profile, force_refresh=False):
+        if profile.name in self.failing:
+            raise InvalidCredentialsException(profile.name)
+
+        return AuthorizationDetails(f'key-{profile.name}', 'secret', 'token'), False
+
+
+class RecordingWriter:
+
+    def __init__(self):
+        self.batches = []
+
+    def write_batch(self, authorizations, region):
+        self.batches.append(([(details.access_key, profile.name) for details, profile in authorizations], region))
+
+
+def test_init_jobs_reports_each_failure_and_writes_once():
+    config = Configuration('role', '000000000000', stored_profiles=[
+        StoredProfile(name, f'{i:012d}') for i, name in enumerate(['dev', 'qa', 'prod'])
+    ])
+    writer = RecordingWriter()
+    manager = ProfileAuthenticationManager(FailingAuthorizer({'qa'}), writer, config)
+
+    results = manager.init_jobs(['dev', 'missing', 'qa', 'prod'], 'eu-west-1')
+
+    assert list(results) == ['dev', 'missing', 'qa', 'prod']
+    assert results['dev'] is None and results['prod'] is None
+    assert isinstance(results['missing'], ProfileNotConfiguredException)
+    assert isinstance(results['qa'], InvalidCredentialsException)
+    assert writer.batches == [([('key-dev', 'dev'), ('key-prod', 'prod')], 'eu-west-1')]
+
+
+def test_init_jobs_records_the_usage_of_the_successes(tmp_path):
+    config = Configuration('role', '000000000000', stored_profiles=[StoredProfile('dev', '111111111111'),
+                                                                    StoredProfile('qa', '222222222222')])
+    history = UsageHistory(tmp_path/'usage.log', 1024 * 1024)
+    manager = ProfileAuthenticationManager(FailingAuthorizer({'qa'}), RecordingWriter(), config, usage_history=history)
+
+    manager.init_jobs(['dev', 'qa'], None)
+
+    assert [(e.profile, e.cached) for e in history.entries()] == [('dev', False)]
@@ -0,0 +1,65 @@
+import os
+
+from aws_assume_role import configuration
+from aws_assume_role.configuration import Configuration, StoredProfile
+from aws_assume_role.profile_index import ProfileIndex, load_profile_index
+
+
+def build_config():
+    return Configuration('admin', '000000000000', stored_profiles=[
+        StoredProfile('prod-payments', '111111111111'),
+        StoredProfile('dev-payments', '222222222222', 'readonly'),
+        StoredProfile('prod-search', '333333333333', aws_profile='sso'),
+        StoredProfile('payments', '444444444444'),
+    ])
+
+
+def test_search_filters():
+    index = ProfileIndex.from_configuration(build_config())
+
+    assert [p.name for p in index.search(prefix='PROD')] == ['prod-payments', 'prod-search']
+    assert [p.name for p in index.search(role_name='admin', aws_profile='default')] == ['prod-payments', 'payments']
+    assert [p.name for p in index.search(account_id='333333333333')] == ['prod-search']
+
+
+def test_default_aws_profile_is_resolved_on_each_query(tmp_path, monkeypatch):
+    monkeypatch.setenv('ASSUME_AWS_CACHE_DIR', str(tmp_path/'cache'))
+    monkeypatch.delenv('ASSUME_AWS_PROFILE', raising=False)
+    config_path = tmp_path/'config.json'
+    configuration.write_config(config_path, build_config())
+
+    load_profile_index(config_path)
+    monkeypatch.setenv('ASSUME_AWS_PROFILE', 'landing')
+    index = load_profile_index(config_path)
+
+    assert [p.aws_profile for p in index.profiles] == ['landing', 'landing', 'sso', 'landing']
+    assert [p.name for p in index.search(aws_profile='landing', prefix='prod')] == ['prod-payments']
+
+
+def test_fuzzy_search_ranking():
+    index = ProfileIndex.from_configuration(build_config())
+
+    assert [p.name for p in index.search(query='pay')] == ['payments', 'dev-payments', 'prod-payments']
+    assert [p.name for p in index.search(query='pdsr')] == ['prod-search']
+
+
+def test_index_rebuilt_only_when_the_config_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('ASSUME_AWS_CACHE_DIR', str(tmp_path/'cache'))
+    config_path = tmp_path/'config.json'
+    config = build_config()
+    configuration.write_config(config_path, config)
+
+    reads = []
+    read_config = configuration.read_config
+    monkeypatch.setattr(configuration, 'read_config', lambda path: reads.append(path) or read_config(path))
+
+    load_profile_index(config_path)
+    load_profile_index(config_path)
+    assert len(reads) == 1
+
+    config.stored_profiles.append(StoredProfile('sandbox', '555555555555'))
+    configuration.write_config(config_path, config)
+    os.utime(config_path, ns=(0, 0))
+
+    assert [p.name for p in load_profile_index(config_path).search(prefix='sand')] == ['sandbox']
+    assert len(reads) == 2
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+from datetime import datetime, timezone, timedelta
+
+from aws_assume_role.authentication.authorization_details import AuthorizationDetails
+from aws_assume_role.configuration import Profile
+from aws_assume_role.sessions import refreshable_credentials
+
+
+class ExpiringAuthorizer:
+
+    def __init__(self, lifetimes):
+        self.lifetimes = lifetimes
+        self.requests = []
+
+    def request_details(self, profile, force_refresh=False):
+        self.requests.append(force_refresh)
+        lifetime = self.lifetimes[len(self.requests) - 1]
+
+        return AuthorizationDetails(f'key-{len(self.requests)}', 'secret', 'token',
+                                    datetime.now(timezone.utc) + lifetime)
+
+
+def test_credentials_are_assumed_again_before_expiring():
+    authorizer = ExpiringAuthorizer([timedelta(minutes=5), timedelta(hours=1)])
+    credentials = refreshable_credentials(authorizer, Profile('dev', '111111111111', 'role', 'default'))
+
+    assert credentials.get_frozen_credentials().access_key == 'key-2'
+    assert credentials.get_frozen_credentials().access_key == 'key-2'
+    assert authorizer.requests == [False, True]
+
+
+def test_package_import_is_light():
+    modules = subprocess.run([sys.executable, '-c', 'import sys, aws_assume_role; print(sorted(sys.modules))'],
+                             capture_output=True, text=True, check=True).stdout
+
+    assert 'boto3' not in modules and 'aws_assume_role.configuration' not in modules
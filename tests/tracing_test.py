@@ -0,0 +1,48 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from aws_assume_role import tracing
+
+
+def test_span_is_shared_noop_without_tracer():
+    assert tracing.get_tracer() is None
+    assert tracing.span('a', key='value') is tracing.span('b')
+
+
+def test_recording_tracer_nests_spans():
+    tracer = tracing.RecordingTracer()
+    tracing.set_tracer(tracer)
+
+    try:
+        with tracing.span('outer'):
+            with tracing.span('inner', profile='dev'):
+                pass
+    finally:
+        tracing.set_tracer(None)
+
+    spans = {s.name: s for s in tracer.spans}
+
+    assert spans['outer'].depth == 0
+    assert spans['inner'].depth == 1
+    assert spans['inner'].duration <= spans['outer'].duration
+    assert [s['name'] for s in json.loads(tracer.to_json())] == ['outer', 'inner']
+    assert 'profile=dev' in tracer.summary()
+
+
+def test_pool_worker_spans_are_nested_under_the_submitter():
+    tracer = tracing.RecordingTracer()
+    tracing.set_tracer(tracer)
+
+    def work(name):
+        with tracing.span(name):
+            pass
+
+    try:
+        with tracing.span('batch'), ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(tracing.in_current_context(work), ['first', 'second']))
+
+        work('after')
+    finally:
+        tracing.set_tracer(None)
+
+    assert {s.name: s.depth for s in tracer.spans} == {'batch': 0, 'first': 1, 'second': 1, 'after': 0}
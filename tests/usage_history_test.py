@@ -0,0 +1,48 @@
+from aws_assume_role.usage_history import UsageHistory, UsageEntry
+
+DAY = 86400
+
+
+def test_rank_by_frecency(tmp_path):
+    history = UsageHistory(tmp_path/'usage.log', 1024 * 1024)
+    now = 100 * DAY
+
+    for _ in range(5):
+        history.record('old', 0.1, now - 30 * DAY)
+
+    history.record('recent', 0.1, now - DAY)
+    history.record('recent', 0.1, now - DAY)
+    history.record('once', 0.1, now - DAY)
+
+    assert [name for name, _ in history.rank(now)] == ['recent', 'once', 'old']
+
+
+def test_rotation_keeps_the_size_bounded(tmp_path):
+    history = UsageHistory(tmp_path/'usage.log', 200)
+
+    for i in range(100):
+        history.record('dev', i / 100, DAY + i)
+
+    entries = history.entries()
+
+    assert history.path.stat().st_size <= 200 and history.rotated_path.stat().st_size <= 200
+    assert 0 < len(entries) < 100 and entries[-1].latency == 0.99
+
+
+def test_latency_percentiles(tmp_path):
+    history = UsageHistory(tmp_path/'usage.log', 1024 * 1024)
+
+    for i in range(1, 101):
+        history.record('dev', i / 1000, DAY)
+
+    assert history.latency_stats() == {'dev': (100, 0, 0.05, 0.095)}
+
+
+def test_cache_hits_are_excluded_from_the_percentiles(tmp_path):
+    history = UsageHistory(tmp_path/'usage.log', 1024 * 1024)
+    history.path.write_text(f'{DAY} 0.5000 old\n')
+
+    history.record('dev', 0.001, DAY, cached=True)
+    history.record_batch([UsageEntry('dev', DAY, 0.2), UsageEntry('qa', DAY, 0.001, cached=True)])
+
+    assert history.latency_stats() == {'dev': (2, 1, 0.2, 0.2), 'old': (1, 0, 0.5, 0.5), 'qa': (1, 1, None, None)}
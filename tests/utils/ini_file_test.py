@@ -0,0 +1,85 @@
+import textwrap
+
+from aws_assume_role.utils.ini_file import IniDocument, edit_ini_file
+
+CREDENTIALS = textwrap.dedent('''\
+    # Managed by hand
+    [default]
+    aws_access_key_id = AKIA
+    aws_secret_access_key = secret ; inline
+
+    [dev]
+    ; old keys
+    aws_access_key_id = old
+    aws_session_token = first
+      continuation
+    [prod]
+    aws_access_key_id = prod
+    ''')
+
+
+def test_update_only_touched_section():
+    document = IniDocument.parse(CREDENTIALS)
+
+    document.update('dev', {'aws_access_key_id': 'new', 'aws_session_token': 'second', 'region': 'eu-west-1'})
+
+    assert str(document) == textwrap.dedent('''\
+        # Managed by hand
+        [default]
+        aws_access_key_id = AKIA
+        aws_secret_access_key = secret ; inline
+
+        [dev]
+        ; old keys
+        aws_access_key_id = new
+        aws_session_token = second
+        region = eu-west-1
+        [prod]
+        aws_access_key_id = prod
+        ''')
+
+
+def test_update_matches_keys_ignoring_case():
+    document = IniDocument.parse('[dev]\nRegion = us-east-1\nAWS_Access_Key_Id = old\n')
+
+    document.update('dev', {'region': 'eu-west-1', 'aws_access_key_id': 'new'})
+
+    assert str(document) == '[dev]\nregion = eu-west-1\naws_access_key_id = new\n'
+    assert document.get('dev') == {'region': 'eu-west-1', 'aws_access_key_id': 'new'}
+
+
+def test_add_and_remove_sections():
+    document = IniDocument.parse(CREDENTIALS)
+
+    document.update('qa', {'aws_access_key_id': 'qa'})
+    document.remove('dev')
+
+    assert document.sections() == ['default', 'prod', 'qa']
+    assert document.get('qa') == {'aws_access_key_id': 'qa'}
+    assert document.get('dev') is None
+    assert str(document).startswith(CREDENTIALS[:CREDENTIALS.index('[dev]')])
+
+
+def test_edit_file_keeps_permissions(tmp_path):
+    path = tmp_path/'credentials'
+    path.write_text(CREDENTIALS)
+    path.chmod(0o640)
+
+    with edit_ini_file(path) as document:
+        document.update('prod', {'aws_access_key_id': 'rotated'})
+
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert IniDocument.parse(path.read_text()).get('prod') == {'aws_access_key_id': 'rotated'}
+    assert not list(tmp_path.glob('.credentials.*.tmp'))
+
+
+def test_update_remove_and_readd_section():
+    document = IniDocument.parse(CREDENTIALS)
+
+    document.remove('dev')
+    document.update('dev', {'aws_access_key_id': 'readded'})
+    document.update('dev', {'region': 'eu-west-1'})
+
+    assert document.sections() == ['default', 'prod', 'dev']
+    assert dict(document.items())['dev'] == {'aws_access_key_id': 'readded', 'region': 'eu-west-1'}
+    assert IniDocument.parse(str(document)).get('dev') == document.get('dev')